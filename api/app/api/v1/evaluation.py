@@ -1,22 +1,67 @@
 import logging
 import uuid
-from datetime import datetime
-from typing import List, Optional
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional, Tuple
 
-from app.core.config import settings
+import orjson
+from app.core.config import DEFAULT_MODELS, ProviderEnum, settings
+from app.core.fast_request import ORJSONRoute
 from app.core.models import (
+    EVAL_RESPONSE_ADAPTER,
+    REQUEST_ADAPTER,
     EvaluationHistory,
     EvaluationResponse,
     PromptEvaluationRequest,
 )
-from app.db.database import DatabaseManager, get_database
+from app.core.time_utils import utcnow_iso
+from app.db.database import DatabaseManager, get_database, get_db_session
 from app.services.evaluation_service import EvaluationError, EvaluationService
+from app.services.llm_providers import LLMProviderError
 from app.services.provider_factory import ProviderFactory
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/v1", tags=["evaluation"])
+router = APIRouter(prefix="/api/v1", tags=["evaluation"], route_class=ORJSONRoute)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def default_model_for(provider: str) -> str:
+    """Get the configured default model for a provider."""
+    try:
+        return DEFAULT_MODELS[ProviderEnum(provider)]
+    except ValueError:
+        raise LLMProviderError(f"Unknown provider: {provider}")
+
+
+# Configured default (provider, model), resolved once at import
+DEFAULT_PROVIDER_MODEL = (
+    settings.llm_provider.value,
+    DEFAULT_MODELS[settings.llm_provider],
+)
+
+
+def resolve_models(
+    generation_provider: Optional[str] = None,
+    generation_model: Optional[str] = None,
+    evaluation_provider: Optional[str] = None,
+    evaluation_model: Optional[str] = None,
+) -> Tuple[str, str, str, str]:
+    """Resolve generation/evaluation providers and models, falling back to defaults."""
+    if generation_provider:
+        gen_provider = generation_provider
+        gen_model = generation_model or default_model_for(gen_provider)
+    else:
+        gen_provider, default_model = DEFAULT_PROVIDER_MODEL
+        gen_model = generation_model or default_model
+
+    eval_provider = evaluation_provider or gen_provider
+    eval_model = evaluation_model or gen_model
+
+    return gen_provider, gen_model, eval_provider, eval_model
 
 
 # Evaluation service setup
@@ -25,16 +70,22 @@ def get_evaluation_service(
     generation_model: Optional[str] = None,
     evaluation_provider: Optional[str] = None,
     evaluation_model: Optional[str] = None,
-):
+) -> EvaluationService:
     """Get evaluation service instance with specific models."""
 
     # Use provided values or fallback to settings defaults
-    gen_provider = generation_provider or settings.llm_provider
-    gen_model = generation_model or (
-        settings.openai_model if gen_provider == "openai" else settings.claude_model
+    gen_provider, gen_model, eval_provider, eval_model = resolve_models(
+        generation_provider, generation_model, evaluation_provider, evaluation_model
     )
-    eval_provider = evaluation_provider or gen_provider
-    eval_model = evaluation_model or gen_model
+
+    return build_evaluation_service(gen_provider, gen_model, eval_provider, eval_model)
+
+
+@lru_cache(maxsize=16)
+def build_evaluation_service(
+    gen_provider: str, gen_model: str, eval_provider: str, eval_model: str
+) -> EvaluationService:
+    """Build an evaluation service, shared across requests for the same models."""
 
     # Create providers with specified models
     generation_provider_instance = ProviderFactory.create_provider_with_model(
@@ -50,9 +101,36 @@ def get_evaluation_service(
     )
 
 
+async def save_evaluation_safely(
+    db: DatabaseManager,
+    evaluation_id: str,
+    request_data: dict,
+    response_data: dict,
+    generation_provider: str,
+    generation_model: str,
+    evaluation_provider: str,
+    evaluation_model: str,
+) -> None:
+    """Save evaluation to database (don't fail if database save fails)."""
+    try:
+        await db.save_evaluation(
+            evaluation_id=evaluation_id,
+            request_data=request_data,
+            response_data=response_data,
+            generation_provider=generation_provider,
+            generation_model=generation_model,
+            evaluation_provider=evaluation_provider,
+            evaluation_model=evaluation_model,
+        )
+    except Exception as e:
+        logger.exception(f"Failed to save evaluation to database: {e}")
+
+
 @router.post("/evaluate", response_model=EvaluationResponse)
 async def evaluate_prompts(
-    request: PromptEvaluationRequest, db: DatabaseManager = Depends(get_database)
+    request: PromptEvaluationRequest,
+    background_tasks: BackgroundTasks,
+    db: DatabaseManager = Depends(get_database),
 ):
     """Evaluate multiple prompts and return ranked results."""
 
@@ -67,15 +145,27 @@ async def evaluate_prompts(
                 detail=f"Maximum {settings.max_prompts_per_request} prompts allowed",
             )
 
+        total_calls = (
+            len(request.prompts) * request.generation_count * request.evaluation_count
+        )
+        if total_calls > settings.max_llm_calls_per_request:
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    f"Request would require {total_calls} LLM calls, "
+                    f"maximum is {settings.max_llm_calls_per_request}"
+                ),
+            )
+
         logger.info(f"Starting evaluation of {len(request.prompts)} prompts")
 
         # Determine models to use - defaults to configuration if not provided
-        gen_provider = request.generation_provider or settings.llm_provider
-        gen_model = request.generation_model or (
-            settings.openai_model if gen_provider == "openai" else settings.claude_model
+        gen_provider, gen_model, eval_provider, eval_model = resolve_models(
+            request.generation_provider,
+            request.generation_model,
+            request.evaluation_provider,
+            request.evaluation_model,
         )
-        eval_provider = request.evaluation_provider or gen_provider
-        eval_model = request.evaluation_model or gen_model
 
         logger.info(
             f"Using models: generation={gen_provider}/{gen_model}, evaluation={eval_provider}/{eval_model}"
@@ -88,6 +178,7 @@ async def evaluate_prompts(
             evaluation_provider=eval_provider,
             evaluation_model=eval_model,
         )
+
         results = await evaluation_service.evaluate_multiple_prompts(  # type: ignore[attr-defined]
             prompts=request.prompts,
             test_input=request.test_input,
@@ -101,7 +192,7 @@ async def evaluate_prompts(
         evaluation_id = str(uuid.uuid4())
         response = EvaluationResponse(
             evaluation_id=evaluation_id,
-            timestamp=datetime.now().isoformat(),
+            timestamp=utcnow_iso(),
             results=results,
             criteria=request.criteria,
             status="completed",
@@ -111,22 +202,30 @@ async def evaluate_prompts(
             evaluation_model=eval_model,
         )
 
-        # Save to database (don't fail if database save fails)
-        try:
-            await db.save_evaluation(
-                evaluation_id=evaluation_id,
-                request_data=request.model_dump(),
-                response_data=response.model_dump(),
-                generation_provider=gen_provider,
-                generation_model=gen_model,
-                evaluation_provider=eval_provider,
-                evaluation_model=eval_model,
-            )
-        except Exception as e:
-            logger.exception(f"Failed to save evaluation to database: {e}")
+        # Save to database after the response is sent
+        background_tasks.add_task(
+            save_evaluation_safely,
+            db,
+            evaluation_id=evaluation_id,
+            request_data=REQUEST_ADAPTER.dump_python(request, mode="json"),
+            response_data=EVAL_RESPONSE_ADAPTER.dump_python(response, mode="json"),
+            generation_provider=gen_provider,
+            generation_model=gen_model,
+            evaluation_provider=eval_provider,
+            evaluation_model=eval_model,
+        )
 
         logger.info(f"Completed evaluation {evaluation_id}")
-        return response
+
+        # The response was built from trusted data; serialize it directly instead
+        # of letting FastAPI re-validate it against response_model
+        return Response(
+            content=EVAL_RESPONSE_ADAPTER.dump_json(response),
+            media_type="application/json",
+        )
+
+    except HTTPException:
+        raise
 
     except EvaluationError as e:
         logger.error(f"Evaluation error: {e}")
@@ -141,18 +240,24 @@ async def evaluate_prompts(
 
 @router.get("/evaluations/{evaluation_id}", response_model=EvaluationResponse)
 async def get_evaluation(
-    evaluation_id: str, db: DatabaseManager = Depends(get_database)
+    evaluation_id: str,
+    db: DatabaseManager = Depends(get_database),
+    session: AsyncSession = Depends(get_db_session),
 ):
     """Get evaluation results by ID."""
 
     try:
-        evaluation = await db.get_evaluation(evaluation_id)
+        evaluation = await db.get_evaluation(evaluation_id, session=session)
 
         if not evaluation:
             raise HTTPException(status_code=404, detail="Evaluation not found")
 
         # Convert database response to API response
-        return EvaluationResponse.model_validate(evaluation.response_data)
+        response = EVAL_RESPONSE_ADAPTER.validate_python(evaluation.response_data)
+        return Response(
+            content=EVAL_RESPONSE_ADAPTER.dump_json(response),
+            media_type="application/json",
+        )
 
     except HTTPException:
         raise
@@ -161,36 +266,60 @@ async def get_evaluation(
         raise HTTPException(status_code=500, detail="Failed to retrieve evaluation")
 
 
-@router.get("/evaluations", response_model=List[EvaluationHistory])
+@router.get(
+    "/evaluations",
+    response_class=StreamingResponse,
+    responses={200: {"model": List[EvaluationHistory]}},
+)
 async def get_recent_evaluations(
-    limit: int = 10, db: DatabaseManager = Depends(get_database)
+    request: Request, limit: int = 10, db: DatabaseManager = Depends(get_database)
 ):
-    """Get recent evaluations."""
+    """
+    Get recent evaluations, streamed one row at a time.
 
-    try:
-        if limit > 50:
-            limit = 50  # Cap at 50 for performance
-
-        evaluations = await db.get_recent_evaluations(limit)
-
-        # Convert to response models - accessing the values, not the column objects
-        history_list: List[EvaluationHistory] = []
-        for eval_db in evaluations:
-            history = EvaluationHistory(
-                id=eval_db.id,  # type: ignore[arg-type]
-                evaluation_id=eval_db.evaluation_id,  # type: ignore[arg-type]
-                request_data=eval_db.request_data,  # type: ignore[arg-type]
-                response_data=eval_db.response_data,  # type: ignore[arg-type]
-                created_at=eval_db.created_at,  # type: ignore[arg-type]
-                updated_at=eval_db.updated_at,  # type: ignore[arg-type]
-            )
-            history_list.append(history)
-        return history_list
+    Rows are sent as a JSON array, or as newline-delimited JSON when the client
+    accepts application/x-ndjson.
+    """
+
+    if limit > 50:
+        limit = 50  # Cap at 50 for performance
 
+    rows = db.iter_recent_evaluations(limit)
+    try:
+        # Run the query and fetch the first batch before the 200 goes out, so
+        # a failing query still gets a 500
+        first_row = await anext(rows, None)
     except Exception as e:
-        logger.error(f"Error retrieving recent evaluations: {e}")
+        logger.error(f"Error retrieving evaluations: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve evaluations")
 
+    async def iter_rows() -> AsyncIterator[dict]:
+        # A later error propagates and aborts the response, so the client
+        # never sees a truncated history as a complete one
+        if first_row is None:
+            return
+        yield first_row
+        async for row in rows:
+            yield row
+
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+
+        async def generate_ndjson() -> AsyncIterator[bytes]:
+            async for row in iter_rows():
+                yield orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE)
+
+        return StreamingResponse(generate_ndjson(), media_type=NDJSON_MEDIA_TYPE)
+
+    async def generate_json_array() -> AsyncIterator[bytes]:
+        yield b"["
+        separator = b""
+        async for row in iter_rows():
+            yield separator + orjson.dumps(row)
+            separator = b","
+        yield b"]"
+
+    return StreamingResponse(generate_json_array(), media_type="application/json")
+
 
 @router.get("/provider-info")
 async def get_provider_info():
@@ -201,8 +330,8 @@ async def get_provider_info():
 
         return {
             "current_providers": provider_info,
-            "configured_provider": settings.llm_provider,
-            "available_providers": ["openai", "claude"],
+            "configured_provider": settings.llm_provider.value,
+            "available_providers": [provider.value for provider in ProviderEnum],
         }
 
     except Exception as e:
@@ -1,10 +1,11 @@
 import logging
-from datetime import datetime
 
 from app.core.config import settings
-from app.db.database import DatabaseManager, get_database
+from app.core.time_utils import utcnow_iso
+from app.db.database import DatabaseManager, get_database, get_db_session
 from fastapi import APIRouter, Depends
 from app.core.models import HealthResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
@@ -12,20 +13,23 @@ router = APIRouter(prefix="/api/v1", tags=["health"])
 
 
 @router.get("/health", response_model=HealthResponse)
-async def health_check(db: DatabaseManager = Depends(get_database)):
+async def health_check(
+    db: DatabaseManager = Depends(get_database),
+    session: AsyncSession = Depends(get_db_session),
+):
     """Health check endpoint."""
 
     # Basic health check
     health_data = {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": utcnow_iso(),
         "version": settings.version,
     }
 
     # Try to check database connection
     try:
         # Simple database check
-        await db.get_recent_evaluations(limit=1)
+        await db.get_recent_evaluations(limit=1, session=session)
         health_data["database"] = "connected"
     except Exception as e:
         logger.warning(f"Database health check failed: {e}")
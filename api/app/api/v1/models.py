@@ -12,7 +12,7 @@ from app.core.models_config import (
     get_generation_models,
     get_model_info,
 )
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 
 router = APIRouter()
 
@@ -65,8 +65,6 @@ async def get_model_details(provider: str, model_id: str):
     Raises:
         404: If model not found
     """
-    from fastapi import HTTPException
-
     model_info = get_model_info(provider, model_id)
     if model_info is None:
         raise HTTPException(
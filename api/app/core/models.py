@@ -2,7 +2,9 @@ from datetime import datetime
 from enum import Enum
 from typing import Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from app.core.time_utils import utcnow_iso
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from pydantic.dataclasses import dataclass
 
 
 class ScoreType(str, Enum):
@@ -12,6 +14,8 @@ class ScoreType(str, Enum):
 
 
 class EvaluationCriterion(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(..., description="Name of the evaluation criterion")
     description: str = Field(
         ..., description="Description of what this criterion measures"
@@ -24,6 +28,29 @@ class EvaluationCriterion(BaseModel):
     )
 
 
+# Default criteria, shared (criteria are frozen) by requests that don't specify any
+DEFAULT_CRITERIA = (
+    EvaluationCriterion(
+        name="accuracy",
+        description="How factually correct and relevant is the response?",
+        weight=0.4,
+        score_type=ScoreType.CONTINUOUS,
+    ),
+    EvaluationCriterion(
+        name="helpfulness",
+        description="How helpful and actionable is the response?",
+        weight=0.3,
+        score_type=ScoreType.CONTINUOUS,
+    ),
+    EvaluationCriterion(
+        name="safety",
+        description="Is the response safe and free from harmful content?",
+        weight=0.3,
+        score_type=ScoreType.CONTINUOUS,
+    ),
+)
+
+
 class PromptEvaluationRequest(BaseModel):
     prompts: List[str] = Field(
         ..., min_length=1, max_length=10, description="List of prompts to evaluate"
@@ -33,26 +60,7 @@ class PromptEvaluationRequest(BaseModel):
         None, description="Expected output for reference"
     )
     criteria: List[EvaluationCriterion] = Field(
-        default=[
-            EvaluationCriterion(
-                name="accuracy",
-                description="How factually correct and relevant is the response?",
-                weight=0.4,
-                score_type=ScoreType.CONTINUOUS,
-            ),
-            EvaluationCriterion(
-                name="helpfulness",
-                description="How helpful and actionable is the response?",
-                weight=0.3,
-                score_type=ScoreType.CONTINUOUS,
-            ),
-            EvaluationCriterion(
-                name="safety",
-                description="Is the response safe and free from harmful content?",
-                weight=0.3,
-                score_type=ScoreType.CONTINUOUS,
-            ),
-        ],
+        default_factory=lambda: list(DEFAULT_CRITERIA),
         description="List of evaluation criteria",
     )
     generation_count: int = Field(
@@ -76,7 +84,10 @@ class PromptEvaluationRequest(BaseModel):
     )
 
 
-class GenerationResult(BaseModel):
+# The two most numerous result types are slotted pydantic dataclasses to keep
+# per-instance memory down; pydantic BaseModel cannot use __slots__ for fields.
+@dataclass(slots=True)
+class GenerationResult:
     """Result of a single generation."""
 
     generation_id: str = Field(..., description="Unique identifier for this generation")
@@ -86,7 +97,8 @@ class GenerationResult(BaseModel):
     )
 
 
-class EvaluationResult(BaseModel):
+@dataclass(slots=True)
+class EvaluationResult:
     """Result of a single evaluation of a generation."""
 
     evaluation_id: str = Field(..., description="Unique identifier for this evaluation")
@@ -161,6 +173,13 @@ class EvaluationHistory(BaseModel):
     )
 
 
+# Precompiled adapters for (de)serializing evaluations on the hot path
+REQUEST_ADAPTER = TypeAdapter(PromptEvaluationRequest)
+CRITERIA_ADAPTER = TypeAdapter(List[EvaluationCriterion])
+PROMPT_RESULT_ADAPTER = TypeAdapter(PromptResult)
+EVAL_RESPONSE_ADAPTER = TypeAdapter(EvaluationResponse)
+
+
 class HealthResponse(BaseModel):
     status: str = Field(..., description="Health status")
     timestamp: str = Field(..., description="Current timestamp")
@@ -171,6 +190,6 @@ class ErrorResponse(BaseModel):
     error: str = Field(..., description="Error message")
     detail: Optional[str] = Field(None, description="Detailed error information")
     timestamp: str = Field(
-        default_factory=lambda: datetime.now().isoformat(),
+        default_factory=utcnow_iso,
         description="Error timestamp",
     )
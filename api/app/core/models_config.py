@@ -2,12 +2,16 @@
 Configuration for available LLM providers and models.
 """
 
-from typing import Dict, List
+from dataclasses import dataclass
+from functools import cache
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Mapping, Tuple
 
-from pydantic import BaseModel
 
-
-class ModelInfo(BaseModel):
+# Static configuration is never parsed from untrusted input, so plain frozen
+# dataclasses are used instead of pydantic models to skip schema building.
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ModelInfo:
     """Information about a specific model."""
 
     id: str  # Model identifier (e.g., "gpt-4o-mini")
@@ -21,22 +25,24 @@ class ModelInfo(BaseModel):
     cost_per_1k_output_tokens: float = 0.0  # Cost in USD
 
 
-class ProviderConfig(BaseModel):
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ProviderConfig:
     """Configuration for a provider."""
 
     name: str  # Provider name
     display_name: str  # Human-readable name
     enabled: bool = True  # Whether this provider is available
-    models: List[ModelInfo]  # Available models for this provider
+    models: Tuple[ModelInfo, ...]  # Available models for this provider
 
 
-# Available models configuration
+# Available models configuration. The lookup indexes below are built from this
+# at import, so it is treated as immutable.
 MODELS_CONFIG: Dict[str, ProviderConfig] = {
     "openai": ProviderConfig(
         name="openai",
         display_name="OpenAI",
         enabled=True,
-        models=[
+        models=(
             ModelInfo(
                 id="gpt-4o-2024-08-06",
                 name="GPT-4o",
@@ -70,13 +76,13 @@ MODELS_CONFIG: Dict[str, ProviderConfig] = {
                 cost_per_1k_input_tokens=0.0001,
                 cost_per_1k_output_tokens=0.0004,
             ),
-        ],
+        ),
     ),
     "claude": ProviderConfig(
         name="claude",
         display_name="Anthropic Claude",
         enabled=True,
-        models=[
+        models=(
             ModelInfo(
                 id="claude-sonnet-4-20250514",
                 name="Claude 4 Sonnet",
@@ -99,46 +105,64 @@ MODELS_CONFIG: Dict[str, ProviderConfig] = {
                 cost_per_1k_input_tokens=0.0008,
                 cost_per_1k_output_tokens=0.004,
             ),
-        ],
+        ),
     ),
 }
 
 
-def get_available_models() -> Dict[str, ProviderConfig]:
-    """Get all available models configuration."""
-    return {name: config for name, config in MODELS_CONFIG.items() if config.enabled}
+# Lookup indexes over enabled providers, built once at import
+_ENABLED_PROVIDERS: Dict[str, ProviderConfig] = {
+    name: config for name, config in MODELS_CONFIG.items() if config.enabled
+}
+_MODELS_BY_PROVIDER_ID: Dict[str, Dict[str, ModelInfo]] = {
+    name: {model.id: model for model in config.models}
+    for name, config in _ENABLED_PROVIDERS.items()
+}
+_GEN_MODELS: Tuple[ModelInfo, ...] = tuple(
+    model
+    for config in _ENABLED_PROVIDERS.values()
+    for model in config.models
+    if model.supports_generation
+)
+_EVAL_MODELS: Tuple[ModelInfo, ...] = tuple(
+    model
+    for config in _ENABLED_PROVIDERS.values()
+    for model in config.models
+    if model.supports_evaluation
+)
+_GEN_KEYS: FrozenSet[Tuple[str, str]] = frozenset(
+    (name, model_id)
+    for name, models in _MODELS_BY_PROVIDER_ID.items()
+    for model_id, model in models.items()
+    if model.supports_generation
+)
+_EVAL_KEYS: FrozenSet[Tuple[str, str]] = frozenset(
+    (name, model_id)
+    for name, models in _MODELS_BY_PROVIDER_ID.items()
+    for model_id, model in models.items()
+    if model.supports_evaluation
+)
+
+
+@cache
+def get_available_models() -> Mapping[str, ProviderConfig]:
+    """Get all available models configuration (read-only)."""
+    return MappingProxyType(_ENABLED_PROVIDERS)
 
 
 def get_model_info(provider: str, model_id: str) -> ModelInfo | None:
     """Get information about a specific model."""
-    if provider not in MODELS_CONFIG:
-        return None
-
-    provider_config = MODELS_CONFIG[provider]
-    if not provider_config.enabled:
-        return None
-
-    for model in provider_config.models:
-        if model.id == model_id:
-            return model
-
-    return None
+    return _MODELS_BY_PROVIDER_ID.get(provider, {}).get(model_id)
 
 
-def get_generation_models() -> List[ModelInfo]:
+def get_generation_models() -> Tuple[ModelInfo, ...]:
     """Get all models that support generation."""
-    models = []
-    for provider_config in get_available_models().values():
-        models.extend([m for m in provider_config.models if m.supports_generation])
-    return models
+    return _GEN_MODELS
 
 
-def get_evaluation_models() -> List[ModelInfo]:
+def get_evaluation_models() -> Tuple[ModelInfo, ...]:
     """Get all models that support evaluation."""
-    models = []
-    for provider_config in get_available_models().values():
-        models.extend([m for m in provider_config.models if m.supports_evaluation])
-    return models
+    return _EVAL_MODELS
 
 
 def is_valid_model_combination(
@@ -148,12 +172,6 @@ def is_valid_model_combination(
     evaluation_model: str,
 ) -> bool:
     """Check if the provider/model combination is valid."""
-    gen_model = get_model_info(generation_provider, generation_model)
-    eval_model = get_model_info(evaluation_provider, evaluation_model)
-
-    return (
-        gen_model is not None
-        and gen_model.supports_generation
-        and eval_model is not None
-        and eval_model.supports_evaluation
-    )
+    gen_key = (generation_provider, generation_model)
+    eval_key = (evaluation_provider, evaluation_model)
+    return gen_key in _GEN_KEYS and eval_key in _EVAL_KEYS
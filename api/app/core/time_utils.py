@@ -0,0 +1,25 @@
+"""
+Time helpers for informational timestamps.
+"""
+
+import time
+from datetime import datetime, timezone
+
+__all__ = ["utcnow_iso"]
+
+_last_second = 0
+_last_iso = ""
+
+
+def utcnow_iso() -> str:
+    """
+    Get the current UTC time as an ISO 8601 string with seconds precision.
+
+    The formatted string is reused for calls within the same second.
+    """
+    global _last_second, _last_iso
+    second = int(time.time())
+    if second != _last_second:
+        _last_iso = datetime.fromtimestamp(second, tz=timezone.utc).isoformat()
+        _last_second = second
+    return _last_iso
@@ -1,17 +1,23 @@
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
+import orjson
 from app.core.config import settings
+from app.core.models import EvaluationHistory
 from sqlalchemy import (
     JSON,
     Column,
     DateTime,
     Integer,
+    Select,
     String,
     create_engine,
     desc,
+    insert,
     select,
+    text,
 )
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
@@ -19,6 +25,11 @@ from sqlalchemy.orm import DeclarativeBase
 logger = logging.getLogger(__name__)
 
 
+def _orjson_serializer(value: Any) -> str:
+    """Serialize JSON column values with orjson (drivers expect str)."""
+    return orjson.dumps(value).decode("utf-8")
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -52,6 +63,13 @@ class DatabaseManager:
             database_url.replace("postgresql://", "postgresql+asyncpg://"),
             echo=settings.debug,
             future=True,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping,
+            json_serializer=_orjson_serializer,
+            json_deserializer=orjson.loads,
         )
 
         # Create async session factory
@@ -60,7 +78,12 @@ class DatabaseManager:
         )
 
         # Create sync engine for migrations
-        self.sync_engine = create_engine(database_url, echo=settings.debug)
+        self.sync_engine = create_engine(
+            database_url,
+            echo=settings.debug,
+            json_serializer=_orjson_serializer,
+            json_deserializer=orjson.loads,
+        )
 
     async def create_tables(self):
         """Create database tables."""
@@ -72,11 +95,28 @@ class DatabaseManager:
             logger.error(f"Failed to create database tables: {e}")
             raise
 
+    async def warm_up(self):
+        """Open a pooled connection so the first request skips connection setup."""
+        async with self.async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        logger.info("Database connection pool warmed up")
+
     async def close(self):
         """Close database connections."""
         await self.async_engine.dispose()
         self.sync_engine.dispose()
 
+    @asynccontextmanager
+    async def _use_session(
+        self, session: Optional[AsyncSession]
+    ) -> AsyncIterator[AsyncSession]:
+        """Use the caller's session if one is given, otherwise open a new one."""
+        if session is not None:
+            yield session
+        else:
+            async with self.async_session() as new_session:
+                yield new_session
+
     async def save_evaluation(
         self,
         evaluation_id: str,
@@ -86,61 +126,115 @@ class DatabaseManager:
         generation_model: str,
         evaluation_provider: str,
         evaluation_model: str,
-    ) -> Optional[EvaluationHistoryDB]:
-        """Save evaluation to database."""
+        session: Optional[AsyncSession] = None,
+    ) -> Optional[int]:
+        """Save evaluation to database and return its database ID."""
         try:
-            async with self.async_session() as session:
-                evaluation = EvaluationHistoryDB(
-                    evaluation_id=evaluation_id,
-                    request_data=request_data,
-                    response_data=response_data,
-                    generation_provider=generation_provider,
-                    generation_model=generation_model,
-                    evaluation_provider=evaluation_provider,
-                    evaluation_model=evaluation_model,
+            async with self._use_session(session) as db_session:
+                stmt = insert(EvaluationHistoryDB).returning(EvaluationHistoryDB.id)
+                result = await db_session.execute(
+                    stmt,
+                    {
+                        "evaluation_id": evaluation_id,
+                        "request_data": request_data,
+                        "response_data": response_data,
+                        "generation_provider": generation_provider,
+                        "generation_model": generation_model,
+                        "evaluation_provider": evaluation_provider,
+                        "evaluation_model": evaluation_model,
+                    },
                 )
-                session.add(evaluation)
-                await session.commit()
-                await session.refresh(evaluation)
+                await db_session.commit()
                 logger.info(
                     f"Saved evaluation {evaluation_id} to database with models: gen={generation_provider}/{generation_model}, eval={evaluation_provider}/{evaluation_model}"
                 )
-                return evaluation
+                return result.scalar_one()
         except Exception as e:
             logger.exception(f"Failed to save evaluation {evaluation_id}: {e}")
             return None
 
-    async def get_evaluation(self, evaluation_id: str) -> Optional[EvaluationHistoryDB]:
+    async def get_evaluation(
+        self, evaluation_id: str, session: Optional[AsyncSession] = None
+    ) -> Optional[EvaluationHistoryDB]:
         """Get evaluation by ID."""
         try:
-            async with self.async_session() as session:
+            async with self._use_session(session) as db_session:
                 stmt = select(EvaluationHistoryDB).filter_by(
                     evaluation_id=evaluation_id
                 )
-                result = await session.execute(stmt)
+                result = await db_session.execute(stmt)
                 return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Failed to get evaluation {evaluation_id}: {e}")
             return None
 
+    @staticmethod
+    def _db_to_response(row) -> EvaluationHistory:
+        """
+        Wrap a history row in an EvaluationHistory without validation.
+
+        Rows are only ever written by save_evaluation from already validated
+        request and response models, so re-validating them on read is wasted
+        work. Never use this for data that did not come from our own table.
+        """
+        return EvaluationHistory.model_construct(
+            id=row.id,
+            evaluation_id=row.evaluation_id,
+            request_data=row.request_data,
+            response_data=row.response_data,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+        )
+
+    @staticmethod
+    def _recent_evaluations_stmt(limit: int) -> Select:
+        """Select the history columns of the most recent evaluations."""
+        table = EvaluationHistoryDB.__table__
+        return (
+            select(
+                table.c.id,
+                table.c.evaluation_id,
+                table.c.request_data,
+                table.c.response_data,
+                table.c.created_at,
+                table.c.updated_at,
+            )
+            .order_by(desc(table.c.created_at))
+            .limit(limit)
+        )
+
     async def get_recent_evaluations(
-        self, limit: int = 10
-    ) -> list[EvaluationHistoryDB]:
-        """Get recent evaluations."""
+        self, limit: int = 10, session: Optional[AsyncSession] = None
+    ) -> list[EvaluationHistory]:
+        """Get recent evaluations, skipping ORM hydration and validation."""
         try:
-            async with self.async_session() as session:
-                stmt = (
-                    select(EvaluationHistoryDB)
-                    .order_by(desc(EvaluationHistoryDB.created_at))
-                    .limit(limit)
-                )
-                result = await session.execute(stmt)
-                evaluations = result.scalars().all()
-                return list(evaluations)
+            async with self._use_session(session) as db_session:
+                stmt = self._recent_evaluations_stmt(limit)
+                result = await db_session.execute(stmt)
+                return [self._db_to_response(row) for row in result.all()]
         except Exception as e:
             logger.error(f"Failed to get recent evaluations: {e}")
             return []
 
+    async def iter_recent_evaluations(
+        self, limit: int = 10, batch_size: int = 10
+    ) -> AsyncIterator[dict]:
+        """
+        Stream recent evaluations as plain dicts, skipping ORM hydration.
+
+        Rows are fetched from a server-side cursor batch_size at a time, so
+        memory stays bounded however large limit is. Database errors propagate,
+        so a failed query is never mistaken for the end of the history.
+        """
+        stmt = self._recent_evaluations_stmt(limit).execution_options(
+            yield_per=batch_size
+        )
+        async with self.async_session() as session:
+            result = await session.stream(stmt)
+            async for partition in result.mappings().partitions():
+                for row in partition:
+                    yield dict(row)
+
 
 # Global database manager instance
 db_manager: Optional[DatabaseManager] = None
@@ -155,6 +249,13 @@ async def get_database() -> DatabaseManager:
     return db_manager
 
 
+async def get_db_session() -> AsyncIterator[AsyncSession]:
+    """Yield one database session shared by all operations in a request."""
+    db = await get_database()
+    async with db.async_session() as session:
+        yield session
+
+
 async def close_database():
     """Close database connection."""
     global db_manager
@@ -7,10 +7,13 @@ import sys
 from contextlib import asynccontextmanager
 
 from app.api.v1 import evaluation, health, models
-from app.core.config import settings
+from app.core.config import DEFAULT_MODELS, settings
 from app.db.database import close_database, get_database
+from app.services.provider_factory import ProviderFactory
+from app.services.rate_limiter import close_rate_limiters, warm_up_token_counting
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 # Configure logging
 logging.basicConfig(
@@ -29,17 +32,32 @@ async def lifespan(app: FastAPI):
     logger.info("Starting LLM Tournament API...")
 
     try:
-        # Initialize database
-        await get_database()
+        # Initialize database and open a pooled connection ahead of requests
+        db = await get_database()
+        await db.warm_up()
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         # Don't fail startup if database is unavailable
 
+    try:
+        # Warm up the shared evaluation service for the configured models
+        evaluation.get_evaluation_service()
+        logger.info("Evaluation service initialized successfully")
+    except Exception as e:
+        logger.error(f"Failed to initialize evaluation service: {e}")
+
+    # Load the tokenizers now rather than on the first LLM call of a request
+    await warm_up_token_counting(DEFAULT_MODELS.values())
+
     yield
 
     # Shutdown
     logger.info("Shutting down LLM Tournament API...")
+    await ProviderFactory.shutdown_clients()
+    await close_rate_limiters()
+    # Cached services hold providers bound to the clients just closed
+    evaluation.build_evaluation_service.cache_clear()
     await close_database()
 
 
@@ -50,6 +68,7 @@ def create_app() -> FastAPI:
         version=settings.version,
         description="A FastAPI backend for evaluating and comparing LLM prompts",
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
     # Configure CORS middleware
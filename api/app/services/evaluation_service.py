@@ -4,11 +4,24 @@ Evaluation service using configurable LLM providers.
 
 import asyncio
 import logging
+import os
 import random
+import time
 import uuid
-from datetime import datetime
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
+from app.core.config import settings
 from app.core.models import (
     EvaluationCriterion,
     EvaluationResult,
@@ -16,12 +29,46 @@ from app.core.models import (
     GenerationResult,
     PromptResult,
 )
+from app.services.llm_cache import llm_cache
 from app.services.llm_providers import LLMProvider, LLMProviderError
 from app.services.provider_factory import create_llm_provider
+from app.services.semantic_cache import semantic_cache
 
 logger = logging.getLogger(__name__)
 
-__all__ = ["EvaluationService", "EvaluationError"]
+T = TypeVar("T")
+
+__all__ = ["EvaluationService", "EvaluationError", "ProviderFailure"]
+
+# Limits how many prompts are evaluated at once across all requests
+prompt_semaphore = asyncio.Semaphore(settings.max_concurrent_prompts)
+
+# Limits how many generation/evaluation calls are in flight at once, so large
+# batches queue here instead of bursting requests at the provider
+llm_call_semaphore = asyncio.Semaphore(settings.max_concurrent_requests)
+
+
+async def _guarded(awaitable: Awaitable[T]) -> T:
+    """Await a single LLM call while holding the call semaphore."""
+    async with llm_call_semaphore:
+        return await awaitable
+
+
+def _uuid4_batch(count: int) -> List[str]:
+    """Generate count random UUID4 strings from a single urandom read."""
+    random_bytes = os.urandom(16 * count)
+    return [
+        str(uuid.UUID(bytes=random_bytes[i * 16 : (i + 1) * 16], version=4))
+        for i in range(count)
+    ]
+
+
+# Reasoning prefixes of the fallback verdicts returned when evaluation fails
+_FAILED_VERDICT_PREFIXES = (
+    "Evaluation failed",
+    "Evaluation parsing failed",
+    "Unexpected evaluation error",
+)
 
 
 class EvaluationError(Exception):
@@ -30,6 +77,30 @@ class EvaluationError(Exception):
     pass
 
 
+@dataclass(slots=True)
+class ProviderFailure:
+    """A failed provider call, returned instead of raising."""
+
+    message: str
+
+
+# (score, reasoning, evaluation time) for one criterion
+CriterionResult = Tuple[float, str, float]
+
+# Criterion name -> (result, criterion) for one evaluation run of a generation
+RunResults = Dict[str, Tuple[CriterionResult, EvaluationCriterion]]
+
+
+@dataclass(slots=True)
+class _EvaluationTask:
+    """One scheduled judge call and the generation and run it belongs to."""
+
+    gen_index: int
+    eval_run: int
+    criteria: List[EvaluationCriterion]
+    call: Coroutine[Any, Any, List[CriterionResult]]
+
+
 class EvaluationService:
     """Service for evaluating prompts using configurable LLM providers."""
 
@@ -54,16 +125,23 @@ class EvaluationService:
             f"evaluation={type(self.evaluation_provider).__name__}"
         )
 
-    async def generate_response(self, prompt: str, test_input: str) -> str:
-        """Generate response using the configured generation provider."""
+    async def generate_response(
+        self, prompt: str, test_input: str
+    ) -> Union[str, ProviderFailure]:
+        """
+        Generate response using the configured generation provider.
+
+        Provider errors are logged and returned as a ProviderFailure rather than
+        raised, so callers can build a fallback result without unwinding.
+        """
         try:
             return await self.generation_provider.generate_response(prompt, test_input)
         except LLMProviderError as e:
             logger.error(f"Provider error during generation: {e}")
-            raise EvaluationError(f"Failed to generate response: {e}")
+            return ProviderFailure(f"Failed to generate response: {e}")
         except Exception as e:
             logger.error(f"Unexpected error during generation: {e}")
-            raise EvaluationError(f"Unexpected generation error: {e}")
+            return ProviderFailure(f"Unexpected generation error: {e}")
 
     async def evaluate_response(
         self,
@@ -73,6 +151,59 @@ class EvaluationService:
         expected_output: Optional[str] = None,
     ) -> tuple[float, str]:
         """Evaluate a single response against one criterion using LLM-as-a-Judge."""
+        if semantic_cache.is_enabled_for(criterion.name):
+            return await self._evaluate_response_with_semantic_cache(
+                output, criterion, test_input, expected_output
+            )
+
+        return await self._evaluate_response_uncached(
+            output, criterion, test_input, expected_output
+        )
+
+    async def _evaluate_response_with_semantic_cache(
+        self,
+        output: str,
+        criterion: EvaluationCriterion,
+        test_input: str,
+        expected_output: Optional[str] = None,
+    ) -> tuple[float, str]:
+        """Reuse the verdict for a near-identical output when one is cached."""
+        scope = semantic_cache.make_scope(
+            criterion.name,
+            criterion.description,
+            expected_output,
+            self.evaluation_provider.model,
+        )
+        try:
+            embedding = await semantic_cache.embed(
+                f"{criterion.name}||{test_input}||{output}"
+            )
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed, skipping cache: {e}")
+            return await self._evaluate_response_uncached(
+                output, criterion, test_input, expected_output
+            )
+
+        verdict = semantic_cache.lookup(scope, embedding)
+        if verdict is not None:
+            return verdict
+
+        score, reasoning = await self._evaluate_response_uncached(
+            output, criterion, test_input, expected_output
+        )
+        # Don't reuse fallback verdicts from failed evaluations
+        if not reasoning.startswith(_FAILED_VERDICT_PREFIXES):
+            semantic_cache.add(scope, embedding, (score, reasoning))
+        return score, reasoning
+
+    async def _evaluate_response_uncached(
+        self,
+        output: str,
+        criterion: EvaluationCriterion,
+        test_input: str,
+        expected_output: Optional[str] = None,
+    ) -> tuple[float, str]:
+        """Ask the evaluation provider for a verdict."""
         try:
             return await self.evaluation_provider.evaluate_response(
                 output=output,
@@ -97,53 +228,41 @@ class EvaluationService:
         """Generate multiple responses for a single prompt."""
         logger.info(f"Generating {generation_count} responses for prompt")
 
-        generation_tasks = [
-            self.generate_single_response_with_timing(prompt, test_input)
-            for _ in range(generation_count)
-        ]
-
-        results = await asyncio.gather(*generation_tasks, return_exceptions=True)
-
-        generation_results: List[GenerationResult] = []
-        for i, result in enumerate(results):
-            if isinstance(result, (Exception, BaseException)):
-                logger.error(f"Failed generation {i}: {result}")
-                generation_results.append(
-                    GenerationResult(
-                        generation_id=str(uuid.uuid4()),
-                        output=f"Generation failed: {str(result)}",
-                        generation_time=0.0,
+        # generate_single_response_with_timing turns failures into fallback
+        # results, so no task raises and the group never cancels siblings
+        generation_ids = _uuid4_batch(generation_count)
+        async with asyncio.TaskGroup() as task_group:
+            generation_tasks = [
+                task_group.create_task(
+                    _guarded(
+                        self.generate_single_response_with_timing(
+                            prompt, test_input, generation_id
+                        )
                     )
                 )
-            elif isinstance(result, GenerationResult):
-                generation_results.append(result)
+                for generation_id in generation_ids
+            ]
 
-        return generation_results
+        return [task.result() for task in generation_tasks]
 
     async def generate_single_response_with_timing(
-        self, prompt: str, test_input: str
+        self, prompt: str, test_input: str, generation_id: Optional[str] = None
     ) -> GenerationResult:
         """Generate a single response with timing."""
-        start_time = datetime.now()
-        generation_id = str(uuid.uuid4())
+        start_time = time.perf_counter()
+        generation_id = generation_id or str(uuid.uuid4())
 
-        try:
-            output = await self.generate_response(prompt, test_input)
-            generation_time = (datetime.now() - start_time).total_seconds()
+        output = await self.generate_response(prompt, test_input)
+        generation_time = time.perf_counter() - start_time
 
-            return GenerationResult(
-                generation_id=generation_id,
-                output=output,
-                generation_time=generation_time,
-            )
-        except Exception as e:
-            generation_time = (datetime.now() - start_time).total_seconds()
-            logger.error(f"Generation {generation_id} failed: {e}")
-            return GenerationResult(
-                generation_id=generation_id,
-                output=f"Generation failed: {str(e)}",
-                generation_time=generation_time,
-            )
+        if isinstance(output, ProviderFailure):
+            output = f"Generation failed: {output.message}"
+
+        return GenerationResult(
+            generation_id=generation_id,
+            output=output,
+            generation_time=generation_time,
+        )
 
     async def evaluate_generation_multiple_times(
         self,
@@ -154,73 +273,111 @@ class EvaluationService:
         evaluation_count: int = 3,
     ) -> GenerationEvaluationResult:
         """Evaluate a single generation multiple times."""
+        results = await self.evaluate_generations(
+            [generation_result], criteria, test_input, expected_output, evaluation_count
+        )
+        return results[0]
+
+    async def evaluate_generations(
+        self,
+        generation_results: List[GenerationResult],
+        criteria: List[EvaluationCriterion],
+        test_input: str,
+        expected_output: Optional[str] = None,
+        evaluation_count: int = 3,
+    ) -> List[GenerationEvaluationResult]:
+        """Evaluate every generation multiple times in a single flat fan-out."""
         logger.info(
-            f"Evaluating generation {generation_result.generation_id} {evaluation_count} times"
+            f"Evaluating {len(generation_results)} generations "
+            f"{evaluation_count} times each"
         )
 
-        # Create evaluation tasks with criteria information, then randomize the order
-        task_info_list = []
-        for eval_run in range(evaluation_count):
-            for criterion in criteria:
-                task_info = {
-                    'eval_run': eval_run,
-                    'criterion': criterion,
-                    'task': self.evaluate_single_with_timing(
-                        generation_result.output, criterion, test_input, expected_output
+        # Each task judges one criterion, or all of them in joint mode
+        if settings.joint_criteria_evaluation and len(criteria) > 1:
+            criteria_groups = [criteria]
+        else:
+            criteria_groups = [[criterion] for criterion in criteria]
+
+        # Create evaluation tasks with generation and criteria information,
+        # then randomize the order
+        task_info_list: List[_EvaluationTask] = []
+        for gen_index, generation_result in enumerate(generation_results):
+            for eval_run in range(evaluation_count):
+                for criteria_group in criteria_groups:
+                    task_info_list.append(
+                        _EvaluationTask(
+                            gen_index=gen_index,
+                            eval_run=eval_run,
+                            criteria=criteria_group,
+                            call=_guarded(
+                                self.evaluate_criteria_with_timing(
+                                    generation_result.output,
+                                    criteria_group,
+                                    test_input,
+                                    expected_output,
+                                )
+                            ),
+                        )
                     )
-                }
-                task_info_list.append(task_info)
-        
+
         # Randomize the evaluation order to reduce position bias
         random.shuffle(task_info_list)
-        
+
         logger.info(f"Randomized evaluation order for {len(task_info_list)} evaluations")
 
-        # Execute all evaluation tasks in randomized order
-        evaluation_tasks = [info['task'] for info in task_info_list]
-        all_evaluation_results = await asyncio.gather(
-            *evaluation_tasks, return_exceptions=True
-        )
+        # Execute all evaluation tasks for all generations in one task group;
+        # evaluate_single_with_timing turns failures into fallback scores
+        async with asyncio.TaskGroup() as task_group:
+            evaluation_tasks = [
+                task_group.create_task(info.call) for info in task_info_list
+            ]
+        all_evaluation_results = [task.result() for task in evaluation_tasks]
 
-        # Map results back to their original evaluation run and criterion
-        results_by_run = {}
-        for i, result in enumerate(all_evaluation_results):
-            eval_run = task_info_list[i]['eval_run']
-            criterion = task_info_list[i]['criterion']
-            
-            if eval_run not in results_by_run:
-                results_by_run[eval_run] = {}
-            
-            results_by_run[eval_run][criterion.name] = (result, criterion)
+        # Map results back to their generation, evaluation run and criterion
+        results_by_gen: List[List[RunResults]] = [
+            [{} for _ in range(evaluation_count)] for _ in generation_results
+        ]
+        for info, group_results in zip(task_info_list, all_evaluation_results):
+            run_results = results_by_gen[info.gen_index][info.eval_run]
+            for criterion, result in zip(info.criteria, group_results):
+                run_results[criterion.name] = (result, criterion)
+
+        return [
+            self._build_generation_evaluation_result(
+                generation_result, criteria, results_by_run
+            )
+            for generation_result, results_by_run in zip(
+                generation_results, results_by_gen
+            )
+        ]
 
+    def _build_generation_evaluation_result(
+        self,
+        generation_result: GenerationResult,
+        criteria: List[EvaluationCriterion],
+        results_by_run: List[RunResults],
+    ) -> GenerationEvaluationResult:
+        """Build the evaluation results and aggregates for one generation."""
         # Create evaluation results from the mapped data
         evaluation_results: list[EvaluationResult] = []
 
-        for eval_run in range(evaluation_count):
-            eval_id = str(uuid.uuid4())
+        eval_ids = _uuid4_batch(len(results_by_run))
+        for eval_id, run_results in zip(eval_ids, results_by_run):
             scores = {}
             reasoning = {}
             total_eval_time = 0.0
 
-            for criterion_name, (result, criterion) in results_by_run[eval_run].items():
-                if isinstance(result, (Exception, BaseException)):
-                    logger.error(f"Evaluation failed for {criterion_name}: {result}")
+            for criterion_name, (result, _) in run_results.items():
+                try:
+                    score, reason, eval_time = result
+                    scores[criterion_name] = score
+                    reasoning[criterion_name] = reason
+                    total_eval_time += eval_time
+                except (TypeError, ValueError) as e:
+                    logger.error(f"Failed to unpack result for {criterion_name}: {e}")
                     scores[criterion_name] = 0.5
-                    reasoning[criterion_name] = f"Evaluation error: {str(result)}"
+                    reasoning[criterion_name] = f"Result unpacking error: {str(e)}"
                     total_eval_time += 0.0
-                else:
-                    try:
-                        score, reason, eval_time = result
-                        scores[criterion_name] = score
-                        reasoning[criterion_name] = reason
-                        total_eval_time += eval_time
-                    except (TypeError, ValueError) as e:
-                        logger.error(
-                            f"Failed to unpack result for {criterion_name}: {e}"
-                        )
-                        scores[criterion_name] = 0.5
-                        reasoning[criterion_name] = f"Result unpacking error: {str(e)}"
-                        total_eval_time += 0.0
 
             evaluation_results.append(
                 EvaluationResult(
@@ -231,24 +388,22 @@ class EvaluationService:
                 )
             )
 
-        # Aggregate scores and reasoning across evaluations
-        aggregated_scores = {}
-        aggregated_reasoning = {}
+        # Aggregate scores and reasoning across evaluations in a single pass
+        criterion_names = [criterion.name for criterion in criteria]
+        score_sums = {name: 0.0 for name in criterion_names}
+        aggregated_reasoning: Dict[str, List[str]] = {
+            name: [] for name in criterion_names
+        }
 
-        for criterion in criteria:
-            criterion_name = criterion.name
-            scores_for_criterion = [
-                eval_result.scores[criterion_name] for eval_result in evaluation_results
-            ]
-            reasoning_for_criterion = [
-                eval_result.reasoning[criterion_name]
-                for eval_result in evaluation_results
-            ]
+        for eval_result in evaluation_results:
+            for name in criterion_names:
+                score_sums[name] += eval_result.scores[name]
+                aggregated_reasoning[name].append(eval_result.reasoning[name])
 
-            aggregated_scores[criterion_name] = sum(scores_for_criterion) / len(
-                scores_for_criterion
-            )
-            aggregated_reasoning[criterion_name] = reasoning_for_criterion
+        run_count = len(evaluation_results)
+        aggregated_scores = {
+            name: score_sums[name] / run_count for name in criterion_names
+        }
 
         return GenerationEvaluationResult(
             generation_result=generation_result,
@@ -265,19 +420,56 @@ class EvaluationService:
         expected_output: Optional[str] = None,
     ) -> tuple[float, str, float]:
         """Evaluate a single response against one criterion with timing."""
-        start_time = datetime.now()
+        start_time = time.perf_counter()
 
         try:
             score, reasoning = await self.evaluate_response(
                 output, criterion, test_input, expected_output
             )
-            evaluation_time = (datetime.now() - start_time).total_seconds()
+            evaluation_time = time.perf_counter() - start_time
             return score, reasoning, evaluation_time
         except Exception as e:
-            evaluation_time = (datetime.now() - start_time).total_seconds()
+            evaluation_time = time.perf_counter() - start_time
             logger.error(f"Evaluation failed: {e}")
             return 0.5, f"Evaluation failed: {e}", evaluation_time
 
+    async def evaluate_criteria_with_timing(
+        self,
+        output: str,
+        criteria: List[EvaluationCriterion],
+        test_input: str,
+        expected_output: Optional[str] = None,
+    ) -> List[CriterionResult]:
+        """
+        Evaluate a response against a group of criteria with timing.
+
+        A single criterion goes through evaluate_response (and the semantic
+        cache); larger groups are judged together in one provider request,
+        and each criterion is credited an equal share of its time.
+        """
+        if len(criteria) == 1:
+            return [
+                await self.evaluate_single_with_timing(
+                    output, criteria[0], test_input, expected_output
+                )
+            ]
+
+        start_time = time.perf_counter()
+
+        try:
+            verdicts = await self.evaluation_provider.evaluate_response_multi(
+                output,
+                [(criterion.name, criterion.description) for criterion in criteria],
+                test_input,
+                expected_output,
+            )
+        except Exception as e:
+            logger.error(f"Evaluation failed: {e}")
+            verdicts = [(0.5, f"Evaluation failed: {e}")] * len(criteria)
+
+        evaluation_time = (time.perf_counter() - start_time) / len(criteria)
+        return [(score, reasoning, evaluation_time) for score, reasoning in verdicts]
+
     async def evaluate_prompt(
         self,
         prompt: str,
@@ -287,8 +479,71 @@ class EvaluationService:
         generation_count: int = 3,
         evaluation_count: int = 3,
     ) -> PromptResult:
-        """Evaluate a single prompt with multiple generations and evaluations."""
-        start_time = datetime.now()
+        """
+        Evaluate a single prompt with multiple generations and evaluations.
+
+        When the result cache is enabled, identical prompt evaluations against
+        the same providers and models are served from the cache.
+        """
+        if not settings.enable_llm_cache:
+            return await self._evaluate_prompt_uncached(
+                prompt,
+                test_input,
+                criteria,
+                expected_output,
+                generation_count,
+                evaluation_count,
+            )
+
+        cache_key = llm_cache.make_key(
+            prompt=prompt,
+            test_input=test_input,
+            criteria=criteria,
+            expected_output=expected_output,
+            generation_count=generation_count,
+            evaluation_count=evaluation_count,
+            generation_provider=type(self.generation_provider).__name__,
+            generation_model=self.generation_provider.model,
+            evaluation_provider=type(self.evaluation_provider).__name__,
+            evaluation_model=self.evaluation_provider.model,
+        )
+        cached_result = llm_cache.get(cache_key)
+        if cached_result is not None:
+            logger.info(
+                f"Result cache hit for prompt {cached_result.prompt_id} "
+                f"(hits={llm_cache.hits}, misses={llm_cache.misses})"
+            )
+            return cached_result
+
+        logger.info(
+            f"Result cache miss (hits={llm_cache.hits}, misses={llm_cache.misses})"
+        )
+        result = await self._evaluate_prompt_uncached(
+            prompt,
+            test_input,
+            criteria,
+            expected_output,
+            generation_count,
+            evaluation_count,
+        )
+
+        # Don't cache failed evaluations
+        if result.generation_evaluation_results:
+            llm_cache.set(cache_key, result)
+
+        return result
+
+    async def _evaluate_prompt_uncached(
+        self,
+        prompt: str,
+        test_input: str,
+        criteria: List[EvaluationCriterion],
+        expected_output: Optional[str] = None,
+        generation_count: int = 3,
+        evaluation_count: int = 3,
+    ) -> PromptResult:
+        """Evaluate a single prompt without consulting the result cache."""
+        start_time = time.perf_counter()
         prompt_id = str(uuid.uuid4())
 
         logger.info(
@@ -303,37 +558,28 @@ class EvaluationService:
             )
 
             # Step 2: Evaluate each generation multiple times
-            generation_eval_tasks = [
-                self.evaluate_generation_multiple_times(
-                    gen_result, criteria, test_input, expected_output, evaluation_count
-                )
-                for gen_result in generation_results
-            ]
-
-            generation_evaluation_results = await asyncio.gather(*generation_eval_tasks)
+            generation_evaluation_results = await self.evaluate_generations(
+                generation_results, criteria, test_input, expected_output, evaluation_count
+            )
 
             # Step 3: Aggregate scores across all generations and evaluations
-            final_scores = {}
-            total_score = 0.0
-
-            for criterion in criteria:
-                criterion_name = criterion.name
-                all_scores_for_criterion = []
-
-                for gen_eval_result in generation_evaluation_results:
-                    all_scores_for_criterion.append(
-                        gen_eval_result.aggregated_scores[criterion_name]
-                    )
-
-                # Average across all generations
-                final_scores[criterion_name] = sum(all_scores_for_criterion) / len(
-                    all_scores_for_criterion
-                )
-                total_score += final_scores[criterion_name] * criterion.weight
+            criterion_totals = {criterion.name: 0.0 for criterion in criteria}
+            for gen_eval_result in generation_evaluation_results:
+                for name, score in gen_eval_result.aggregated_scores.items():
+                    criterion_totals[name] += score
+
+            # Average across all generations
+            generation_total = len(generation_evaluation_results)
+            final_scores = {
+                name: total / generation_total
+                for name, total in criterion_totals.items()
+            }
+            total_score = sum(
+                final_scores[criterion.name] * criterion.weight for criterion in criteria
+            )
 
             # Calculate execution time
-            end_time = datetime.now()
-            execution_time = (end_time - start_time).total_seconds()
+            execution_time = time.perf_counter() - start_time
 
             result = PromptResult(
                 prompt_id=prompt_id,
@@ -355,7 +601,7 @@ class EvaluationService:
             return result
 
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start_time
             logger.error(f"Failed to evaluate prompt {prompt_id}: {e}")
 
             # Return error result
@@ -382,31 +628,23 @@ class EvaluationService:
         """Evaluate multiple prompts against the same criteria."""
         logger.info(f"Starting batch evaluation of {len(prompts)} prompts")
 
-        # Create evaluation tasks
-        eval_tasks = [
-            self.evaluate_prompt(
-                prompt,
-                test_input,
-                criteria,
-                expected_output,
-                generation_count,
-                evaluation_count,
-            )
-            for prompt in prompts
-        ]
-
-        results = await asyncio.gather(*eval_tasks, return_exceptions=True)
-
-        # Handle any exceptions in results
-        processed_results: List[PromptResult] = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Failed to evaluate prompt {i}: {result}")
-                # Create error result
-                processed_results.append(
-                    PromptResult(
+        async def evaluate_prompt_bounded(prompt: str) -> PromptResult:
+            async with prompt_semaphore:
+                try:
+                    return await self.evaluate_prompt(
+                        prompt,
+                        test_input,
+                        criteria,
+                        expected_output,
+                        generation_count,
+                        evaluation_count,
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to evaluate prompt: {e}")
+                    # Create error result
+                    return PromptResult(
                         prompt_id=str(uuid.uuid4()),
-                        prompt=prompts[i],
+                        prompt=prompt,
                         generation_evaluation_results=[],
                         final_scores={c.name: 0.0 for c in criteria},
                         total_score=0.0,
@@ -414,8 +652,21 @@ class EvaluationService:
                         generation_count=generation_count,
                         evaluation_count=evaluation_count,
                     )
+
+        # Collect results as they finish; they are sorted by score below, so
+        # completion order does not matter
+        processed_results: List[PromptResult] = []
+        async with asyncio.TaskGroup() as task_group:
+            eval_tasks = [
+                task_group.create_task(evaluate_prompt_bounded(prompt))
+                for prompt in prompts
+            ]
+            for completed in asyncio.as_completed(eval_tasks):
+                result = await completed
+                logger.info(
+                    f"Prompt {result.prompt_id} finished "
+                    f"({len(processed_results) + 1}/{len(prompts)})"
                 )
-            elif isinstance(result, PromptResult):
                 processed_results.append(result)
 
         # Sort by total score (descending)
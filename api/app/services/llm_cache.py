@@ -0,0 +1,104 @@
+"""
+Result cache for prompt evaluations.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.models import (
+    CRITERIA_ADAPTER,
+    PROMPT_RESULT_ADAPTER,
+    EvaluationCriterion,
+    PromptResult,
+)
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["LLMCache", "llm_cache"]
+
+
+class LLMCache:
+    """In-process LRU cache of prompt results with a TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        # Maps key -> (expiry timestamp, serialized PromptResult)
+        self._entries: OrderedDict[str, Tuple[float, bytes]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        prompt: str,
+        test_input: str,
+        criteria: List[EvaluationCriterion],
+        expected_output: Optional[str],
+        generation_count: int,
+        evaluation_count: int,
+        generation_provider: str,
+        generation_model: str,
+        evaluation_provider: str,
+        evaluation_model: str,
+    ) -> str:
+        """Build a cache key from everything that affects a prompt result."""
+        payload = {
+            "prompt": prompt,
+            "test_input": test_input,
+            "criteria": CRITERIA_ADAPTER.dump_python(criteria, mode="json"),
+            "expected_output": expected_output,
+            "generation_count": generation_count,
+            "evaluation_count": evaluation_count,
+            "generation_provider": generation_provider,
+            "generation_model": generation_model,
+            "evaluation_provider": evaluation_provider,
+            "evaluation_model": evaluation_model,
+        }
+        return hashlib.blake2b(
+            json.dumps(payload, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[PromptResult]:
+        """Get a cached result, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return PROMPT_RESULT_ADAPTER.validate_json(value)
+
+    def set(self, key: str, result: PromptResult) -> None:
+        """Store a result, evicting the least recently used entry if full."""
+        self._entries[key] = (
+            time.monotonic() + self.ttl_seconds,
+            PROMPT_RESULT_ADAPTER.dump_json(result),
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached results."""
+        self._entries.clear()
+
+
+# Global cache instance
+llm_cache = LLMCache(
+    max_entries=settings.llm_cache_max_entries,
+    ttl_seconds=settings.llm_cache_ttl_seconds,
+)
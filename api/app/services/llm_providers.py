@@ -2,19 +2,115 @@
 LLM provider implementations for different AI services.
 """
 
-import json
+import asyncio
 import logging
+import time
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple
-
-from anthropic import AsyncAnthropic
-from app.services.rate_limiter import with_rate_limiting_and_retry
-from openai import AsyncOpenAI
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import orjson
+from app.core.config import settings
+from app.services.rate_limiter import (
+    estimate_tokens_batch,
+    get_rate_limiter,
+    rate_limited,
+    with_rate_limiting_and_retry,
+)
+from app.services.response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 
 __all__ = ["LLMProvider", "OpenAIProvider", "ClaudeProvider", "LLMProviderError"]
 
+# Static parts of the judge prompt, built once rather than on every call
+_EVAL_HEAD = (
+    "You are an expert evaluator. Please evaluate the following response "
+    "based on this criterion:\n\n"
+)
+_EVAL_GUIDELINES = """1. A score from 0.0 to 1.0 (where 1.0 is perfect; 1 decimal only)
+2. Brief reasoning for your score (maximum 2 sentences, no newline)
+
+Consider the following scoring guidelines:
+- 0.9-1.0: Exceptional quality, meets all requirements perfectly
+- 0.7-0.8: Good quality, meets most requirements with minor issues
+- 0.5-0.6: Average quality, meets some requirements but has notable issues
+- 0.3-0.4: Below average, significant issues or gaps
+- 0.0-0.2: Poor quality, fails to meet basic requirements"""
+_EVAL_TAIL = (
+    "\n\nPlease provide:\n"
+    + _EVAL_GUIDELINES
+    + """
+
+Respond in this exact JSON format:
+{"reasoning": "First sentence describing adherance. A second sentence describing deviation.", "score": 0.0}"""
+)
+
+# Judge prompt parts for scoring one response against several criteria at once
+_EVAL_MULTI_HEAD = (
+    "You are an expert evaluator. Please evaluate the following response "
+    "separately against each of these criteria:\n\n"
+)
+_EVAL_MULTI_TAIL = (
+    "\n\nFor each criterion, provide:\n"
+    + _EVAL_GUIDELINES
+    + "\n\nReturn one verdict per criterion, in the order listed, "
+    "naming each criterion exactly as given."
+)
+
+# Structured verdict the judge must return; reasoning comes before the score
+_VERDICT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "reasoning": {"type": "string"},
+        "score": {"type": "number"},
+    },
+    "required": ["reasoning", "score"],
+    "additionalProperties": False,
+}
+
+_VERDICTS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "verdicts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "criterion": {"type": "string"},
+                    **_VERDICT_SCHEMA["properties"],
+                },
+                "required": ["criterion", "reasoning", "score"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["verdicts"],
+    "additionalProperties": False,
+}
+
+# Judge instructions sent as a cacheable system block, ahead of the per-call fields
+_EVAL_SYSTEM = (
+    "You are an expert evaluator. You will be given a response to evaluate "
+    "based on a single criterion." + _EVAL_TAIL
+)
+
+# Marks a prompt block for Anthropic prompt caching
+_CACHE_CONTROL = {"type": "ephemeral"}
+
+# Sampling settings shared by every generation path, so cache keys line up
+_GENERATION_TEMPERATURE = 0.7
+_GENERATION_MAX_TOKENS = 500
+
 
 class LLMProviderError(Exception):
     """Custom exception for LLM provider errors."""
@@ -25,14 +121,87 @@ class LLMProviderError(Exception):
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
 
+    # Name used to pick the provider's rate limiter and quota settings
+    provider_name = ""
+
     def __init__(self, model: str):
         self.model = model
 
+    @staticmethod
+    @abstractmethod
+    def create_client(api_key: str) -> Any:
+        """Create the SDK client shared by this provider's instances."""
+        pass
+
+    def _response_cache_key(self, temperature: float, *key_parts) -> str:
+        """Build the response cache key for a call to this provider."""
+        return response_cache.make_key(
+            type(self).__name__, self.model, temperature, *key_parts
+        )
+
+    @staticmethod
+    def _generation_cache_parts(prompt: str, test_input: str) -> Tuple:
+        """Response cache key parts for a generation call."""
+        return ("generate", prompt, test_input, _GENERATION_MAX_TOKENS)
+
+    async def _with_response_cache(
+        self,
+        key_parts: Tuple,
+        temperature: float,
+        call: Callable[[], Awaitable[str]],
+    ) -> str:
+        """
+        Return the raw model output for a call, using the response cache.
+
+        Only non-empty outputs are stored, so failures are retried next time.
+        """
+        if not response_cache.is_cacheable(temperature):
+            return await call()
+
+        key = self._response_cache_key(temperature, *key_parts)
+        cached = await response_cache.get(key)
+        if cached is not None:
+            logger.debug(f"Response cache hit for {type(self).__name__}/{self.model}")
+            return cached
+
+        content = await call()
+        if content.strip():
+            await response_cache.put(key, content)
+        return content
+
     @abstractmethod
     async def generate_response(self, prompt: str, test_input: str) -> str:
         """Generate response using the prompt and test input."""
         pass
 
+    @abstractmethod
+    def _stream_generation(self, prompt: str, test_input: str) -> AsyncIterator[str]:
+        """Make one streamed generation call, yielding text chunks."""
+        pass
+
+    async def generate_response_stream(
+        self, prompt: str, test_input: str
+    ) -> AsyncIterator[str]:
+        """
+        Stream a generated response as text chunks, for showing partial output.
+
+        Calls that may be served from the response cache yield the whole
+        response as one chunk.
+        """
+        if response_cache.is_cacheable(_GENERATION_TEMPERATURE):
+            yield await self.generate_response(prompt, test_input)
+            return
+
+        async with rate_limited(
+            input_text=f"{prompt}\n{test_input}",
+            provider=self.provider_name,
+            model=self.model,
+            max_output_tokens=_GENERATION_MAX_TOKENS,
+        ) as output:
+            async for chunk in self._stream_generation(prompt, test_input):
+                output.append(chunk)
+                yield chunk
+
     @abstractmethod
     async def evaluate_response(
         self,
@@ -45,74 +214,223 @@ class LLMProvider(ABC):
         """Evaluate a response against a criterion using LLM-as-a-Judge."""
         pass
 
-    def _build_evaluation_prompt(
+    async def evaluate_response_multi(
         self,
         output: str,
-        criterion_name: str,
-        criterion_description: str,
+        criteria: List[Tuple[str, str]],
         test_input: str,
         expected_output: Optional[str] = None,
-    ) -> str:
-        """Build evaluation prompt based on G-Eval framework."""
-        prompt = f"""You are an expert evaluator. Please evaluate the following response based on this criterion:
+    ) -> List[Tuple[float, str]]:
+        """
+        Evaluate a response against several (name, description) criteria.
+
+        The default makes one judge call per criterion concurrently; providers
+        override this to avoid re-sending the output and input for each one.
+        """
+        return await asyncio.gather(
+            *(
+                self.evaluate_response(
+                    output, name, description, test_input, expected_output
+                )
+                for name, description in criteria
+            )
+        )
+
+    async def batch_generate(
+        self, items: List[Tuple[str, str]]
+    ) -> List[Union[str, BaseException]]:
+        """
+        Generate responses for many (prompt, test_input) pairs.
+
+        Providers with a batch API override this for large offline runs; the
+        default makes individual calls concurrently. Each item gets either its
+        output or the exception that failed it, in item order.
+        """
+        return await self._generate_concurrently(items)
+
+    async def _generate_concurrently(
+        self, items: List[Tuple[str, str]]
+    ) -> List[Union[str, BaseException]]:
+        """Generate one response per item with bounded concurrency."""
+        if not items:
+            return []
+
+        # Size the whole run against the rate limit before launching it
+        input_tokens = sum(
+            estimate_tokens_batch(
+                [f"{prompt}\n{test_input}" for prompt, test_input in items],
+                self.model,
+            )
+        )
+        output_tokens = _GENERATION_MAX_TOKENS * len(items)
+        limiter = get_rate_limiter(self.provider_name, self.model)
+        minutes = max(
+            input_tokens / limiter.input_tokens_per_minute,
+            output_tokens / limiter.output_tokens_per_minute,
+        )
+        logger.info(
+            f"Generating {len(items)} responses: ~{input_tokens} input tokens, "
+            f"up to {output_tokens} output tokens, ~{minutes:.1f} min at the rate limit"
+        )
 
-Criterion: {criterion_name}
-Description: {criterion_description}
+        semaphore = asyncio.Semaphore(settings.max_concurrent_requests)
 
-Original Input: {test_input}
-Response to Evaluate: {output}"""
+        async def generate_one(prompt: str, test_input: str) -> str:
+            async with semaphore:
+                return await self.generate_response(prompt, test_input)
 
-        if expected_output:
-            prompt += f"\nExpected Output: {expected_output}"
+        # One failed item must not discard the outputs of the others
+        results = await asyncio.gather(
+            *(generate_one(prompt, test_input) for prompt, test_input in items),
+            return_exceptions=True,
+        )
+        failures = sum(isinstance(result, BaseException) for result in results)
+        if failures:
+            logger.warning(f"{failures} of {len(items)} generations failed")
+        return results
 
-        prompt += """
+    def _build_evaluation_fields(
+        self,
+        output: str,
+        criterion_name: str,
+        criterion_description: str,
+        test_input: str,
+        expected_output: Optional[str] = None,
+    ) -> str:
+        """Build the per-call part of the evaluation prompt."""
+        context = self._build_evaluation_context(output, test_input, expected_output)
+        return (
+            f"Criterion: {criterion_name}\n"
+            f"Description: {criterion_description}\n\n"
+            f"{context}"
+        )
 
-Please provide:
-1. A score from 0.0 to 1.0 (where 1.0 is perfect; 1 decimal only)
-2. Brief reasoning for your score (maximum 2 sentences, no newline)
+    def _build_evaluation_context(
+        self, output: str, test_input: str, expected_output: Optional[str] = None
+    ) -> str:
+        """Build the part of the evaluation prompt shared by all criteria."""
+        expected = (
+            f"\nExpected Output: {expected_output}" if expected_output else ""
+        )
+        return f"Original Input: {test_input}\nResponse to Evaluate: {output}{expected}"
 
-Consider the following scoring guidelines:
-- 0.9-1.0: Exceptional quality, meets all requirements perfectly
-- 0.7-0.8: Good quality, meets most requirements with minor issues
-- 0.5-0.6: Average quality, meets some requirements but has notable issues
-- 0.3-0.4: Below average, significant issues or gaps
-- 0.0-0.2: Poor quality, fails to meet basic requirements
+    def _build_evaluation_prompt(
+        self,
+        output: str,
+        criterion_name: str,
+        criterion_description: str,
+        test_input: str,
+        expected_output: Optional[str] = None,
+    ) -> str:
+        """Build evaluation prompt based on G-Eval framework."""
+        fields = self._build_evaluation_fields(
+            output, criterion_name, criterion_description, test_input, expected_output
+        )
+        return f"{_EVAL_HEAD}{fields}{_EVAL_TAIL}"
 
-Respond in this exact JSON format:
-{"reasoning": "First sentence describing adherance. A second sentence describing deviation.", "score": 0.0}"""
+    def _build_multi_evaluation_prompt(
+        self,
+        output: str,
+        criteria: List[Tuple[str, str]],
+        test_input: str,
+        expected_output: Optional[str] = None,
+    ) -> str:
+        """Build a prompt that scores one response against several criteria."""
+        criteria_lines = "\n".join(
+            f"- {name}: {description}" for name, description in criteria
+        )
+        context = self._build_evaluation_context(output, test_input, expected_output)
+        return f"{_EVAL_MULTI_HEAD}{criteria_lines}\n\n{context}{_EVAL_MULTI_TAIL}"
 
-        return prompt
+    @staticmethod
+    def _read_verdict(result: Dict[str, Any]) -> Tuple[float, str]:
+        """Get the clamped score and reasoning from a verdict object."""
+        score = float(result["score"])
+        return max(0.0, min(1.0, score)), str(result["reasoning"])
 
     def _parse_evaluation_response(self, content: str) -> Tuple[float, str]:
-        """Parse the evaluation response JSON."""
+        """Parse a structured verdict into a clamped score and reasoning."""
         try:
-            starting_idx = content.find('{"reasoning":')
-            if starting_idx > 0:
-                content = content[starting_idx:]
-
-            if not content.endswith("}"):
-                content += "}"
-
-            result = json.loads(content.strip())
-            score = float(result.get("score", 0.5))
-            reasoning = str(result.get("reasoning", "No reasoning provided"))
+            return self._read_verdict(orjson.loads(content))
+        except (orjson.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            # Only reachable if the verdict was cut off at max_tokens
+            logger.warning(f"Failed to parse evaluation response: {content}")
+            return 0.5, f"Evaluation parsing failed: {str(e)}"
 
-            # Clamp score to valid range
-            score = max(0.0, min(1.0, score))
+    def _parse_multi_evaluation_response(
+        self, content: str, criterion_names: List[str]
+    ) -> List[Tuple[float, str]]:
+        """Parse a list of structured verdicts, one per criterion name."""
+        try:
+            verdicts = {
+                str(verdict["criterion"]): verdict
+                for verdict in orjson.loads(content)["verdicts"]
+            }
+        except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+            logger.warning(f"Failed to parse evaluation response: {content}")
+            return [(0.5, f"Evaluation parsing failed: {str(e)}")] * len(
+                criterion_names
+            )
 
-            return score, reasoning
+        results = []
+        for name in criterion_names:
+            if name not in verdicts:
+                logger.warning(f"No verdict for criterion {name}: {content}")
+                results.append((0.5, "Evaluation parsing failed: No verdict returned"))
+                continue
 
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
-            logger.exception(f"Failed to parse evaluation response: {content}")
-            return 0.5, f"Evaluation parsing failed: {str(e)}"
+            try:
+                results.append(self._read_verdict(verdicts[name]))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Failed to parse verdict for criterion {name}: {content}")
+                results.append((0.5, f"Evaluation parsing failed: {str(e)}"))
+        return results
 
 
 class OpenAIProvider(LLMProvider):
     """OpenAI GPT provider implementation."""
 
-    def __init__(self, api_key: str, model: str = "gpt-4"):
+    provider_name = "openai"
+
+    def __init__(self, api_key: str, model: str = "gpt-4", client: Any = None):
         super().__init__(model)
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.client = client or self.create_client(api_key)
+
+    @staticmethod
+    def create_client(api_key: str) -> Any:
+        """Create an SDK client with a connection pool sized to the rate limiter."""
+        # Imported here so deployments only load the SDKs they actually use
+        import httpx
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        return AsyncOpenAI(
+            api_key=api_key,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.max_concurrent_requests,
+                    max_keepalive_connections=settings.max_concurrent_requests,
+                ),
+                timeout=httpx.Timeout(60.0, connect=5.0),
+            ),
+        )
+
+    async def _stream_generation(
+        self, prompt: str, test_input: str
+    ) -> AsyncIterator[str]:
+        """Stream a generation from OpenAI GPT models."""
+        async with self.client.chat.completions.stream(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": prompt},
+                {"role": "user", "content": test_input},
+            ],
+            max_completion_tokens=_GENERATION_MAX_TOKENS,
+            temperature=_GENERATION_TEMPERATURE,
+        ) as stream:
+            async for event in stream:
+                # The opening chunk only carries the role, as an empty delta
+                if event.type == "content.delta" and event.delta:
+                    yield event.delta
 
     async def generate_response(self, prompt: str, test_input: str) -> str:
         """Generate response using OpenAI GPT models."""
@@ -125,30 +443,35 @@ class OpenAIProvider(LLMProvider):
                     {"role": "system", "content": prompt},
                     {"role": "user", "content": test_input},
                 ],
-                max_completion_tokens=500,
-                temperature=0.7,
+                max_completion_tokens=_GENERATION_MAX_TOKENS,
+                temperature=_GENERATION_TEMPERATURE,
             )
 
-            content = response.choices[0].message.content
-            if content is None or content.strip() == "":
-                logger.warning(
-                    f"Empty response from OpenAI for prompt: {prompt[:50]}..."
-                )
-                return "No response generated. The model returned empty content."
-
-            return content.strip()
+            return response.choices[0].message.content or ""
 
         try:
-            return await with_rate_limiting_and_retry(
-                _make_request,
-                operation_name="OpenAI generation",
-                input_text=input_text,
-                estimated_output_length=500,
+            content = await self._with_response_cache(
+                self._generation_cache_parts(prompt, test_input),
+                _GENERATION_TEMPERATURE,
+                lambda: with_rate_limiting_and_retry(
+                    _make_request,
+                    operation_name="OpenAI generation",
+                    input_text=input_text,
+                    provider=self.provider_name,
+                    model=self.model,
+                    max_output_tokens=_GENERATION_MAX_TOKENS,
+                ),
             )
         except Exception as e:
             logger.error(f"Failed to generate response with OpenAI: {str(e)}")
             raise LLMProviderError(f"OpenAI generation failed: {str(e)}")
 
+        if content.strip() == "":
+            logger.warning(f"Empty response from OpenAI for prompt: {prompt[:50]}...")
+            return "No response generated. The model returned empty content."
+
+        return content.strip()
+
     async def evaluate_response(
         self,
         output: str,
@@ -168,78 +491,311 @@ class OpenAIProvider(LLMProvider):
                 messages=[{"role": "user", "content": eval_prompt}],
                 max_completion_tokens=200,
                 temperature=0.1,
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {
+                        "name": "verdict",
+                        "strict": True,
+                        "schema": _VERDICT_SCHEMA,
+                    },
+                },
             )
 
-            content = response.choices[0].message.content
-            if content is None or content.strip() == "":
-                logger.warning(
-                    f"Empty evaluation response for criterion: {criterion_name}"
-                )
-                return 0.5, "Evaluation failed: Empty response from evaluator model"
-
-            return self._parse_evaluation_response(content.strip())
+            return response.choices[0].message.content or ""
 
         try:
-            return await with_rate_limiting_and_retry(
-                _make_request,
-                operation_name=f"OpenAI evaluation ({criterion_name})",
-                input_text=eval_prompt,
-                estimated_output_length=200,
+            content = await self._with_response_cache(
+                ("verdict", eval_prompt, 200),
+                0.1,
+                lambda: with_rate_limiting_and_retry(
+                    _make_request,
+                    operation_name=f"OpenAI evaluation ({criterion_name})",
+                    input_text=eval_prompt,
+                    provider=self.provider_name,
+                    model=self.model,
+                    max_output_tokens=200,
+                ),
             )
         except Exception as e:
             logger.error(f"Failed to evaluate response with OpenAI: {str(e)}")
             return 0.5, f"Evaluation failed: {str(e)}"
 
+        if content.strip() == "":
+            logger.warning(f"Empty evaluation response for criterion: {criterion_name}")
+            return 0.5, "Evaluation failed: Empty response from evaluator model"
+
+        return self._parse_evaluation_response(content.strip())
+
+    async def evaluate_response_multi(
+        self,
+        output: str,
+        criteria: List[Tuple[str, str]],
+        test_input: str,
+        expected_output: Optional[str] = None,
+    ) -> List[Tuple[float, str]]:
+        """Evaluate a response against several criteria in one OpenAI call."""
+        if not criteria:
+            return []
+
+        eval_prompt = self._build_multi_evaluation_prompt(
+            output, criteria, test_input, expected_output
+        )
+        max_tokens = 200 * len(criteria)
+
+        async def _make_request():
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": eval_prompt}],
+                max_completion_tokens=max_tokens,
+                temperature=0.1,
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {
+                        "name": "verdicts",
+                        "strict": True,
+                        "schema": _VERDICTS_SCHEMA,
+                    },
+                },
+            )
+
+            return response.choices[0].message.content or ""
+
+        try:
+            content = await self._with_response_cache(
+                ("verdicts", eval_prompt, max_tokens),
+                0.1,
+                lambda: with_rate_limiting_and_retry(
+                    _make_request,
+                    operation_name=f"OpenAI evaluation ({len(criteria)} criteria)",
+                    input_text=eval_prompt,
+                    provider=self.provider_name,
+                    model=self.model,
+                    max_output_tokens=max_tokens,
+                ),
+            )
+        except Exception as e:
+            logger.error(f"Failed to evaluate response with OpenAI: {str(e)}")
+            return [(0.5, f"Evaluation failed: {str(e)}")] * len(criteria)
+
+        return self._parse_multi_evaluation_response(
+            content.strip(), [name for name, _ in criteria]
+        )
+
+    async def batch_generate(
+        self, items: List[Tuple[str, str]]
+    ) -> List[Union[str, BaseException]]:
+        """
+        Generate responses for many (prompt, test_input) pairs.
+
+        Runs of at least settings.batch_api_min_items uncached items go through
+        the OpenAI Batch API, which is cheaper but may take up to 24 hours, so
+        this is meant for offline runs. Items the batch could not answer are
+        retried one by one, as are all of them if the batch fails or outlives
+        settings.batch_max_wait_seconds; any still failing are returned as
+        their exception.
+        """
+        cacheable = response_cache.is_cacheable(_GENERATION_TEMPERATURE)
+        keys = [
+            self._response_cache_key(
+                _GENERATION_TEMPERATURE,
+                *self._generation_cache_parts(prompt, test_input),
+            )
+            for prompt, test_input in items
+        ]
+        results: Dict[int, Union[str, BaseException]] = {}
+        if cacheable:
+            for i, key in enumerate(keys):
+                cached = await response_cache.get(key)
+                if cached is not None:
+                    results[i] = cached
+
+        pending = [i for i in range(len(items)) if i not in results]
+        if len(pending) < settings.batch_api_min_items:
+            outputs = await self._generate_concurrently([items[i] for i in pending])
+            results.update(zip(pending, outputs))
+            return [results[i] for i in range(len(items))]
+
+        batch_requests = [
+            {
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": items[i][0]},
+                        {"role": "user", "content": items[i][1]},
+                    ],
+                    "max_completion_tokens": _GENERATION_MAX_TOKENS,
+                    "temperature": _GENERATION_TEMPERATURE,
+                },
+            }
+            for i in pending
+        ]
+        try:
+            batch_outputs = await self._run_batch(batch_requests)
+        except Exception as e:
+            # Every item still gets its output or its own exception
+            logger.warning(
+                f"OpenAI batch failed, generating {len(pending)} items "
+                f"individually: {e}"
+            )
+            batch_outputs = {}
+
+        failed = []
+        for i in pending:
+            content = (batch_outputs.get(str(i)) or "").strip()
+            if not content:
+                failed.append(i)
+                continue
+            if cacheable:
+                await response_cache.put(keys[i], content)
+            results[i] = content
+
+        retried = await self._generate_concurrently([items[i] for i in failed])
+        results.update(zip(failed, retried))
+
+        return [results[i] for i in range(len(items))]
+
+    async def _run_batch(self, requests: List[dict]) -> Dict[str, Optional[str]]:
+        """Submit chat completion requests as a batch and wait for the output."""
+        batch_file = await self.client.files.create(
+            file=("batch.jsonl", b"\n".join(orjson.dumps(r) for r in requests)),
+            purpose="batch",
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        logger.info(f"Submitted OpenAI batch {batch.id} with {len(requests)} requests")
+
+        deadline = time.monotonic() + settings.batch_max_wait_seconds
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                await self.client.batches.cancel(batch.id)
+                raise LLMProviderError(
+                    f"OpenAI batch {batch.id} still {batch.status} after "
+                    f"{settings.batch_max_wait_seconds}s, cancelled"
+                )
+            await asyncio.sleep(min(settings.batch_poll_interval_seconds, remaining))
+            batch = await self.client.batches.retrieve(batch.id)
+
+        if batch.status != "completed" or batch.output_file_id is None:
+            raise LLMProviderError(f"OpenAI batch {batch.id} ended as {batch.status}")
+
+        output_file = await self.client.files.content(batch.output_file_id)
+        outputs: Dict[str, Optional[str]] = {}
+        for line in output_file.text.splitlines():
+            record = orjson.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                logger.warning(
+                    f"Batch request {record['custom_id']} failed: "
+                    f"{record.get('error') or response.get('body')}"
+                )
+                continue
+            outputs[record["custom_id"]] = response["body"]["choices"][0]["message"][
+                "content"
+            ]
+
+        return outputs
+
 
 class ClaudeProvider(LLMProvider):
     """Anthropic Claude provider implementation."""
 
-    def __init__(self, api_key: str, model: str = "claude-3-5-sonnet-20241022"):
+    provider_name = "claude"
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "claude-3-5-sonnet-20241022",
+        client: Any = None,
+    ):
         super().__init__(model)
-        self.client = AsyncAnthropic(api_key=api_key)
+        self.client = client or self.create_client(api_key)
+
+    @staticmethod
+    def create_client(api_key: str) -> Any:
+        """Create an SDK client with a connection pool sized to the rate limiter."""
+        # Imported here so deployments only load the SDKs they actually use
+        import httpx
+        from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+        return AsyncAnthropic(
+            api_key=api_key,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.max_concurrent_requests,
+                    max_keepalive_connections=settings.max_concurrent_requests,
+                ),
+                timeout=httpx.Timeout(60.0, connect=5.0),
+            ),
+        )
+
+    async def _stream_generation(
+        self, prompt: str, test_input: str
+    ) -> AsyncIterator[str]:
+        """Stream a generation from Claude models."""
+        # Claude uses a different message format; the prompt is shared by every
+        # generation and test input, so cache it as the system block
+        async with self.client.beta.prompt_caching.messages.stream(
+            model=self.model,
+            max_tokens=_GENERATION_MAX_TOKENS,
+            temperature=_GENERATION_TEMPERATURE,
+            system=[{"type": "text", "text": prompt, "cache_control": _CACHE_CONTROL}],
+            messages=[{"role": "user", "content": test_input}],
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
 
     async def generate_response(self, prompt: str, test_input: str) -> str:
         """Generate response using Claude models."""
         input_text = f"{prompt}\n{test_input}"
 
         async def _make_request():
-            # Claude uses a different message format
-            system_prompt = prompt
-            user_message = test_input
-
-            response = await self.client.messages.create(
+            # Claude uses a different message format; the prompt is shared by
+            # every generation and test input, so cache it as the system block
+            response = await self.client.beta.prompt_caching.messages.create(
                 model=self.model,
-                max_tokens=500,
-                temperature=0.7,
-                system=system_prompt,
-                messages=[{"role": "user", "content": user_message}],
+                max_tokens=_GENERATION_MAX_TOKENS,
+                temperature=_GENERATION_TEMPERATURE,
+                system=[
+                    {"type": "text", "text": prompt, "cache_control": _CACHE_CONTROL}
+                ],
+                messages=[{"role": "user", "content": test_input}],
             )
 
             # Extract text content from Claude's response
-            content = ""
-            for block in response.content:
-                if block.type == "text":
-                    content += block.text
-
-            if not content or content.strip() == "":
-                logger.warning(
-                    f"Empty response from Claude for prompt: {prompt[:50]}..."
-                )
-                return "No response generated. The model returned empty content."
-
-            return content.strip()
+            return "".join(
+                block.text for block in response.content if block.type == "text"
+            )
 
         try:
-            return await with_rate_limiting_and_retry(
-                _make_request,
-                operation_name="Claude generation",
-                input_text=input_text,
-                estimated_output_length=500,
+            content = await self._with_response_cache(
+                self._generation_cache_parts(prompt, test_input),
+                _GENERATION_TEMPERATURE,
+                lambda: with_rate_limiting_and_retry(
+                    _make_request,
+                    operation_name="Claude generation",
+                    input_text=input_text,
+                    provider=self.provider_name,
+                    model=self.model,
+                    max_output_tokens=_GENERATION_MAX_TOKENS,
+                ),
             )
         except Exception as e:
             logger.error(f"Failed to generate response with Claude: {str(e)}")
             raise LLMProviderError(f"Claude generation failed: {str(e)}")
 
+        if content.strip() == "":
+            logger.warning(f"Empty response from Claude for prompt: {prompt[:50]}...")
+            return "No response generated. The model returned empty content."
+
+        return content.strip()
+
     async def evaluate_response(
         self,
         output: str,
@@ -249,39 +805,110 @@ class ClaudeProvider(LLMProvider):
         expected_output: Optional[str] = None,
     ) -> Tuple[float, str]:
         """Evaluate a response using Claude as judge."""
-        eval_prompt = self._build_evaluation_prompt(
+        eval_fields = self._build_evaluation_fields(
             output, criterion_name, criterion_description, test_input, expected_output
         )
+        return await self._request_verdict(
+            eval_fields, criterion_name, f"{_EVAL_SYSTEM}\n\n{eval_fields}"
+        )
+
+    async def evaluate_response_multi(
+        self,
+        output: str,
+        criteria: List[Tuple[str, str]],
+        test_input: str,
+        expected_output: Optional[str] = None,
+    ) -> List[Tuple[float, str]]:
+        """
+        Evaluate a response against several criteria with Claude as judge.
+
+        The output and input go first in a cached block, so only the criterion
+        lines are new input for every call after the first.
+        """
+        if not criteria:
+            return []
+
+        context = self._build_evaluation_context(output, test_input, expected_output)
+
+        async def evaluate_one(name: str, description: str) -> Tuple[float, str]:
+            criterion_fields = f"Criterion: {name}\nDescription: {description}"
+            return await self._request_verdict(
+                [
+                    {"type": "text", "text": context, "cache_control": _CACHE_CONTROL},
+                    {"type": "text", "text": criterion_fields},
+                ],
+                name,
+                f"{_EVAL_SYSTEM}\n\n{context}\n\n{criterion_fields}",
+            )
+
+        # The first call writes the cache entry the others read
+        first = await evaluate_one(*criteria[0])
+        rest = await asyncio.gather(
+            *(evaluate_one(name, description) for name, description in criteria[1:])
+        )
+        return [first, *rest]
+
+    async def _request_verdict(
+        self, content: Any, criterion_name: str, eval_prompt: str
+    ) -> Tuple[float, str]:
+        """
+        Make one Claude judge call for the given user message content.
+
+        eval_prompt is the full text of the call, used for the response cache
+        key and token estimate.
+        """
 
         async def _make_request():
-            response = await self.client.messages.create(
+            # The judge instructions are identical across calls, so they go
+            # first as a cached system block
+            response = await self.client.beta.prompt_caching.messages.create(
                 model=self.model,
                 max_tokens=200,
                 temperature=0.1,
-                messages=[{"role": "user", "content": eval_prompt}],
+                system=[
+                    {
+                        "type": "text",
+                        "text": _EVAL_SYSTEM,
+                        "cache_control": _CACHE_CONTROL,
+                    }
+                ],
+                messages=[{"role": "user", "content": content}],
+                tools=[
+                    {
+                        "name": "verdict",
+                        "description": "Record the verdict for the response.",
+                        "input_schema": _VERDICT_SCHEMA,
+                    }
+                ],
+                tool_choice={"type": "tool", "name": "verdict"},
             )
 
-            # Extract text content from Claude's response
-            content = ""
+            # The forced tool call carries the verdict as parsed JSON
             for block in response.content:
-                if block.type == "text":
-                    content += block.text
+                if block.type == "tool_use":
+                    return orjson.dumps(block.input).decode()
 
-            if not content or content.strip() == "":
-                logger.warning(
-                    f"Empty evaluation response for criterion: {criterion_name}"
-                )
-                return 0.5, "Evaluation failed: Empty response from evaluator model"
-
-            return self._parse_evaluation_response(content.strip())
+            return ""
 
         try:
-            return await with_rate_limiting_and_retry(
-                _make_request,
-                operation_name=f"Claude evaluation ({criterion_name})",
-                input_text=eval_prompt,
-                estimated_output_length=200,
+            content = await self._with_response_cache(
+                ("verdict", eval_prompt, 200),
+                0.1,
+                lambda: with_rate_limiting_and_retry(
+                    _make_request,
+                    operation_name=f"Claude evaluation ({criterion_name})",
+                    input_text=eval_prompt,
+                    provider=self.provider_name,
+                    model=self.model,
+                    max_output_tokens=200,
+                ),
             )
         except Exception as e:
             logger.error(f"Failed to evaluate response with Claude: {str(e)}")
             return 0.5, f"Evaluation failed: {str(e)}"
+
+        if content.strip() == "":
+            logger.warning(f"Empty evaluation response for criterion: {criterion_name}")
+            return 0.5, "Evaluation failed: Empty response from evaluator model"
+
+        return self._parse_evaluation_response(content.strip())
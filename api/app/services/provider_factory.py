@@ -3,9 +3,10 @@ Factory for creating LLM provider instances.
 """
 
 import logging
-from typing import Optional, Type
+from typing import Any, Dict, Optional, Tuple, Type
 
 from app.core.config import settings
+from app.core.models_config import get_model_info
 from app.services.llm_providers import (
     ClaudeProvider,
     LLMProvider,
@@ -26,6 +27,23 @@ class ProviderFactory:
         "claude": ClaudeProvider,
     }
 
+    # Provider instances shared across requests, keyed by (provider, model)
+    _instances: Dict[Tuple[str, str], LLMProvider] = {}
+
+    # SDK clients shared across provider instances, keyed by (provider, api_key),
+    # so every model of a provider reuses one connection pool
+    _clients: Dict[Tuple[str, str], Any] = {}
+
+    @classmethod
+    def get_client(cls, provider_name: str, api_key: str) -> Any:
+        """Get the shared SDK client for a provider and API key."""
+        key = (provider_name.lower(), api_key)
+        client = cls._clients.get(key)
+        if client is None:
+            client = cls._providers[key[0]].create_client(api_key)
+            cls._clients[key] = client
+        return client
+
     @classmethod
     def create_provider(
         cls, provider_name: str, model: Optional[str] = None
@@ -46,11 +64,13 @@ class ProviderFactory:
                 return provider_class(
                     api_key=settings.openai_api_key,
                     model=model or settings.openai_model,
+                    client=cls.get_client(provider_name, settings.openai_api_key),
                 )
             elif provider_name == "claude":
                 return provider_class(
                     api_key=settings.anthropic_api_key,
                     model=model or settings.claude_model,
+                    client=cls.get_client(provider_name, settings.anthropic_api_key),
                 )
             else:
                 raise LLMProviderError(
@@ -67,8 +87,16 @@ class ProviderFactory:
     def create_provider_with_model(
         cls, provider_name: str, model_id: str
     ) -> LLMProvider:
-        """Create an LLM provider instance with a specific model."""
-        from app.core.models_config import get_model_info
+        """
+        Get an LLM provider instance with a specific model.
+
+        Instances are cached per (provider, model) so SDK clients and their
+        connection pools are reused across requests.
+        """
+        key = (provider_name.lower(), model_id)
+        provider = cls._instances.get(key)
+        if provider is not None:
+            return provider
 
         model_info = get_model_info(provider_name, model_id)
         if model_info is None:
@@ -76,13 +104,32 @@ class ProviderFactory:
                 f"Model {model_id} not found for provider {provider_name}"
             )
 
-        return cls.create_provider(provider_name, model_id)
+        provider = cls.create_provider(provider_name, model_id)
+        cls._instances[key] = provider
+        return provider
 
     @classmethod
     def get_available_providers(cls) -> list[str]:
         """Get list of available provider names."""
         return list(cls._providers.keys())
 
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop all cached provider instances."""
+        cls._instances.clear()
+
+    @classmethod
+    async def shutdown_clients(cls) -> None:
+        """Close all shared SDK clients and their connection pools."""
+        clients = list(cls._clients.values())
+        cls._clients.clear()
+        cls._instances.clear()
+        for client in clients:
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close LLM client: {e}")
+
     @classmethod
     def register_provider(cls, name: str, provider_class: Type[LLMProvider]) -> None:
         """Register a new provider class."""
@@ -90,6 +137,7 @@ class ProviderFactory:
             raise ValueError("Provider class must inherit from LLMProvider")
 
         cls._providers[name.lower()] = provider_class
+        cls.clear_cache()
         logger.info(f"Registered new provider: {name}")
 
 
@@ -107,7 +155,7 @@ def create_llm_provider(provider_name: Optional[str] = None) -> LLMProvider:
         LLMProviderError: If provider creation fails
     """
     if provider_name is None:
-        provider_name = settings.llm_provider
+        provider_name = settings.llm_provider.value
 
     logger.info(f"Creating LLM provider: {provider_name}")
     return ProviderFactory.create_provider(provider_name)
@@ -4,21 +4,46 @@ Rate limiting and retry logic for LLM API calls.
 
 import asyncio
 import logging
+import math
+import random
 import time
 from collections import deque
-from dataclasses import dataclass
-from typing import Awaitable, Callable, Dict, TypeVar
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
-from app.core.config import settings
+from app.core.config import RateLimiterBackend, settings
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
 __all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
     "RateLimitError",
     "RateLimiter",
+    "RedisRateLimiter",
     "RetryHandler",
+    "close_rate_limiters",
+    "estimate_tokens_batch",
+    "get_circuit_breaker",
+    "get_rate_limiter",
+    "rate_limited",
+    "warm_up_token_counting",
     "with_rate_limiting_and_retry",
 ]
 
@@ -29,17 +54,21 @@ class RateLimitError(Exception):
     pass
 
 
-@dataclass
-class RequestRecord:
-    """Record of a request for rate limiting purposes."""
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open."""
 
-    timestamp: float
-    input_tokens: int
-    output_tokens: int
+    pass
 
 
 class RateLimiter:
-    """Token-based rate limiter for API requests."""
+    """
+    Token-bucket rate limiter for API requests.
+
+    Each bucket holds up to one minute of tokens and refills continuously.
+    Callers reserve their estimated tokens up front and settle the difference
+    with actual usage on release. Waiters sleep exactly until enough tokens
+    have refilled, or until a release frees a slot or refunds tokens.
+    """
 
     def __init__(
         self,
@@ -51,10 +80,15 @@ class RateLimiter:
         self.output_tokens_per_minute = output_tokens_per_minute
         self.max_concurrent = max_concurrent
 
-        # Track requests in the last minute
-        self.request_history: deque[RequestRecord] = deque()
+        # Token buckets start full
+        self.input_tokens_avail = float(input_tokens_per_minute)
+        self.output_tokens_avail = float(output_tokens_per_minute)
+        self.last_refill = time.monotonic()
         self.concurrent_count = 0
-        self.lock = asyncio.Lock()
+        # Only used to sleep until capacity frees up; the counters themselves
+        # are never read and updated across an await
+        self.condition = asyncio.Condition()
+        self.waiting = 0
 
         logger.info(
             f"Initialized rate limiter: {input_tokens_per_minute} input tokens/min, "
@@ -62,78 +96,308 @@ class RateLimiter:
             f"{max_concurrent} max concurrent"
         )
 
-    def _clean_old_requests(self) -> None:
-        """Remove requests older than 1 minute."""
-        cutoff_time = time.time() - 60  # 1 minute ago
-        while self.request_history and self.request_history[0].timestamp < cutoff_time:
-            self.request_history.popleft()
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last refill, up to the capacity."""
+        now = time.monotonic()
+        elapsed = now - self.last_refill
+        self.last_refill = now
 
-    def _get_current_usage(self) -> Dict[str, int]:
-        """Get current token usage in the last minute."""
-        self._clean_old_requests()
+        self.input_tokens_avail = min(
+            self.input_tokens_per_minute,
+            self.input_tokens_avail + elapsed * self.input_tokens_per_minute / 60,
+        )
+        self.output_tokens_avail = min(
+            self.output_tokens_per_minute,
+            self.output_tokens_avail + elapsed * self.output_tokens_per_minute / 60,
+        )
 
-        input_tokens = sum(record.input_tokens for record in self.request_history)
-        output_tokens = sum(record.output_tokens for record in self.request_history)
+    def _get_current_usage(self) -> Dict[str, int]:
+        """Get the tokens currently spent from each bucket."""
+        self._refill()
 
         return {
-            "input_tokens": input_tokens,
-            "output_tokens": output_tokens,
+            "input_tokens": int(self.input_tokens_per_minute - self.input_tokens_avail),
+            "output_tokens": int(
+                self.output_tokens_per_minute - self.output_tokens_avail
+            ),
             "concurrent": self.concurrent_count,
         }
 
+    def _seconds_until_available(
+        self, estimated_input_tokens: int, estimated_output_tokens: int
+    ) -> float:
+        """
+        Get how long until a request fits, 0 if it fits now.
+
+        Returns infinity when only a released slot can make room.
+        """
+        if self.concurrent_count >= self.max_concurrent:
+            return math.inf
+
+        # Some buffer for estimation errors, capped so huge requests still run
+        input_needed = min(estimated_input_tokens * 1.2, self.input_tokens_per_minute)
+        output_needed = min(
+            estimated_output_tokens * 1.2, self.output_tokens_per_minute
+        )
+
+        input_wait = (
+            (input_needed - self.input_tokens_avail) * 60 / self.input_tokens_per_minute
+        )
+        output_wait = (
+            (output_needed - self.output_tokens_avail)
+            * 60
+            / self.output_tokens_per_minute
+        )
+        return max(0.0, input_wait, output_wait)
+
     async def can_proceed(
         self, estimated_input_tokens: int, estimated_output_tokens: int
     ) -> bool:
         """Check if a request can proceed without hitting rate limits."""
-        async with self.lock:
-            usage = self._get_current_usage()
+        self._refill()
+        return (
+            self._seconds_until_available(
+                estimated_input_tokens, estimated_output_tokens
+            )
+            == 0
+        )
 
-            # Check concurrent limit
-            if usage["concurrent"] >= self.max_concurrent:
-                return False
+    async def _wait_locked(
+        self,
+        estimated_input_tokens: int,
+        estimated_output_tokens: int,
+        max_wait_time: float,
+    ) -> None:
+        """Wait for capacity; the caller must hold the condition."""
+        deadline = time.monotonic() + max_wait_time
 
-            # Check token limits (with some buffer for estimation errors)
-            input_buffer = estimated_input_tokens * 1.2  # 20% buffer
-            output_buffer = estimated_output_tokens * 1.2
+        while True:
+            self._refill()
+            delay = self._seconds_until_available(
+                estimated_input_tokens, estimated_output_tokens
+            )
+            if delay == 0:
+                return
 
-            if (usage["input_tokens"] + input_buffer) > self.input_tokens_per_minute:
-                return False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                usage = self._get_current_usage()
+                raise RateLimitError(
+                    f"Rate limit wait timeout after {max_wait_time}s. "
+                    f"Current usage: {usage['input_tokens']}/{self.input_tokens_per_minute} input, "
+                    f"{usage['output_tokens']}/{self.output_tokens_per_minute} output, "
+                    f"{usage['concurrent']}/{self.max_concurrent} concurrent"
+                )
 
-            if (usage["output_tokens"] + output_buffer) > self.output_tokens_per_minute:
-                return False
+            logger.debug(
+                f"Waiting up to {min(delay, remaining):.2f}s for rate limit capacity: "
+                f"{estimated_input_tokens} input + {estimated_output_tokens} output tokens"
+            )
+            try:
+                await asyncio.wait_for(
+                    self.condition.wait(), timeout=min(delay, remaining)
+                )
+            except asyncio.TimeoutError:
+                pass
 
-            return True
+    async def _wait(
+        self,
+        estimated_input_tokens: int,
+        estimated_output_tokens: int,
+        max_wait_time: float,
+    ) -> None:
+        """
+        Wait for capacity, returning with no await in between if it's free now.
+
+        asyncio runs one task at a time, so a check followed by a reservation
+        with no await between them is atomic. The condition is only needed to
+        sleep, and the fast path is skipped while others wait so they keep
+        their turn.
+        """
+        if not self.waiting:
+            self._refill()
+            if (
+                self._seconds_until_available(
+                    estimated_input_tokens, estimated_output_tokens
+                )
+                == 0
+            ):
+                return
+
+        async with self.condition:
+            self.waiting += 1
+            try:
+                await self._wait_locked(
+                    estimated_input_tokens, estimated_output_tokens, max_wait_time
+                )
+            finally:
+                self.waiting -= 1
+
+    async def wait_for_capacity(
+        self,
+        estimated_input_tokens: int,
+        estimated_output_tokens: int,
+        max_wait_time: float = 60.0,
+    ) -> None:
+        """Wait until there's capacity for the request."""
+        await self._wait(estimated_input_tokens, estimated_output_tokens, max_wait_time)
 
     async def acquire(
-        self, estimated_input_tokens: int, estimated_output_tokens: int
+        self,
+        estimated_input_tokens: int,
+        estimated_output_tokens: int,
+        max_wait_time: float = 60.0,
     ) -> None:
-        """Acquire a slot for making a request (increment concurrent count)."""
-        async with self.lock:
-            self.concurrent_count += 1
-            logger.debug(
-                f"Acquired slot: {self.concurrent_count}/{self.max_concurrent} concurrent, "
-                f"estimated {estimated_input_tokens} input + {estimated_output_tokens} output tokens"
-            )
+        """Wait for capacity, then take a slot and reserve the estimated tokens."""
+        await self._wait(estimated_input_tokens, estimated_output_tokens, max_wait_time)
+
+        # No await since the wait returned, so the capacity is still there
+        self.concurrent_count += 1
+        self.input_tokens_avail -= estimated_input_tokens
+        self.output_tokens_avail -= estimated_output_tokens
+        logger.debug(
+            f"Acquired slot: {self.concurrent_count}/{self.max_concurrent} concurrent, "
+            f"estimated {estimated_input_tokens} input + {estimated_output_tokens} output tokens"
+        )
 
     async def release(
-        self, actual_input_tokens: int, actual_output_tokens: int
+        self,
+        actual_input_tokens: int,
+        actual_output_tokens: int,
+        estimated_input_tokens: int = 0,
+        estimated_output_tokens: int = 0,
     ) -> None:
-        """Release a slot and record actual token usage."""
-        async with self.lock:
-            self.concurrent_count = max(0, self.concurrent_count - 1)
-
-            # Record actual usage
-            record = RequestRecord(
-                timestamp=time.time(),
-                input_tokens=actual_input_tokens,
-                output_tokens=actual_output_tokens,
-            )
-            self.request_history.append(record)
+        """Release a slot and settle reserved tokens against actual usage."""
+        self.concurrent_count = max(0, self.concurrent_count - 1)
 
-            logger.debug(
-                f"Released slot: {self.concurrent_count}/{self.max_concurrent} concurrent, "
-                f"recorded {actual_input_tokens} input + {actual_output_tokens} output tokens"
-            )
+        # Refund over-estimates, charge under-estimates
+        self.input_tokens_avail += estimated_input_tokens - actual_input_tokens
+        self.output_tokens_avail += estimated_output_tokens - actual_output_tokens
+
+        logger.debug(
+            f"Released slot: {self.concurrent_count}/{self.max_concurrent} concurrent, "
+            f"recorded {actual_input_tokens} input + {actual_output_tokens} output tokens"
+        )
+
+        # Only take the lock when there is someone to wake
+        if self.waiting:
+            async with self.condition:
+                self.condition.notify_all()
+
+
+class RedisRateLimiter:
+    """
+    Rate limiter whose token counters live in Redis, shared by all workers.
+
+    Tokens are counted in fixed one-minute windows (<prefix>:in:<minute> and
+    <prefix>:out:<minute>) that expire after two minutes. A reservation is an
+    atomic INCRBY on both counters, rolled back if either exceeds its limit.
+    The concurrency limit stays per process, since it bounds local connections.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        input_tokens_per_minute: int = 20000,
+        output_tokens_per_minute: int = 8000,
+        max_concurrent: int = 10,
+        key_prefix: str = "rl",
+        poll_interval: float = 0.5,
+        client: Any = None,
+    ):
+        if client is None:
+            try:
+                from redis import asyncio as aioredis
+            except ImportError as e:
+                raise ImportError(
+                    "The redis rate limiter backend requires the redis package "
+                    "(install the redis extra)"
+                ) from e
+            client = aioredis.from_url(redis_url)
+
+        self.redis = client
+        self.input_tokens_per_minute = input_tokens_per_minute
+        self.output_tokens_per_minute = output_tokens_per_minute
+        self.max_concurrent = max_concurrent
+        self.key_prefix = key_prefix
+        self.poll_interval = poll_interval
+
+        self.concurrent_count = 0
+        self.slots = asyncio.Semaphore(max_concurrent)
+
+        logger.info(
+            f"Initialized Redis rate limiter: {input_tokens_per_minute} input tokens/min, "
+            f"{output_tokens_per_minute} output tokens/min, "
+            f"{max_concurrent} max concurrent per process"
+        )
+
+    def _keys(self) -> Tuple[str, str]:
+        """Get the input and output counter keys for the current window."""
+        window = int(time.time() // 60)
+        return (
+            f"{self.key_prefix}:in:{window}",
+            f"{self.key_prefix}:out:{window}",
+        )
+
+    async def _incr(self, input_tokens: int, output_tokens: int) -> Tuple[int, int]:
+        """Atomically add to both counters of the current window."""
+        input_key, output_key = self._keys()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.incrby(input_key, input_tokens).expire(input_key, 120)
+            pipe.incrby(output_key, output_tokens).expire(output_key, 120)
+            input_used, _, output_used, _ = await pipe.execute()
+        return input_used, output_used
+
+    async def _get_current_usage(self) -> Dict[str, int]:
+        """Get the tokens used in the current window."""
+        input_used, output_used = await self.redis.mget(*self._keys())
+
+        return {
+            "input_tokens": int(input_used or 0),
+            "output_tokens": int(output_used or 0),
+            "concurrent": self.concurrent_count,
+        }
+
+    async def _try_reserve(
+        self, estimated_input_tokens: int, estimated_output_tokens: int
+    ) -> bool:
+        """Reserve the estimated tokens if both windows have room."""
+        input_used, output_used = await self._incr(
+            estimated_input_tokens, estimated_output_tokens
+        )
+
+        # A request larger than the limit may still run in an empty window
+        input_fits = (
+            input_used <= self.input_tokens_per_minute
+            or input_used == estimated_input_tokens
+        )
+        output_fits = (
+            output_used <= self.output_tokens_per_minute
+            or output_used == estimated_output_tokens
+        )
+        if input_fits and output_fits:
+            return True
+
+        await self._incr(-estimated_input_tokens, -estimated_output_tokens)
+        return False
+
+    def _seconds_until_next_window(self) -> float:
+        return 60 - time.time() % 60
+
+    async def can_proceed(
+        self, estimated_input_tokens: int, estimated_output_tokens: int
+    ) -> bool:
+        """Check if a request can proceed without hitting rate limits."""
+        if self.concurrent_count >= self.max_concurrent:
+            return False
+
+        usage = await self._get_current_usage()
+        return (
+            usage["input_tokens"] + estimated_input_tokens
+            <= self.input_tokens_per_minute
+            and usage["output_tokens"] + estimated_output_tokens
+            <= self.output_tokens_per_minute
+        )
 
     async def wait_for_capacity(
         self,
@@ -142,31 +406,173 @@ class RateLimiter:
         max_wait_time: float = 60.0,
     ) -> None:
         """Wait until there's capacity for the request."""
-        start_time = time.time()
+        deadline = time.monotonic() + max_wait_time
 
         while not await self.can_proceed(
             estimated_input_tokens, estimated_output_tokens
         ):
-            if time.time() - start_time > max_wait_time:
-                usage = self._get_current_usage()
-                raise RateLimitError(
-                    f"Rate limit wait timeout after {max_wait_time}s. "
-                    f"Current usage: {usage['input_tokens']}/{self.input_tokens_per_minute} input, "
-                    f"{usage['output_tokens']}/{self.output_tokens_per_minute} output, "
-                    f"{usage['concurrent']}/{self.max_concurrent} concurrent"
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                await self._raise_timeout(max_wait_time)
+            await asyncio.sleep(
+                min(self.poll_interval, self._seconds_until_next_window(), remaining)
+            )
+
+    async def acquire(
+        self,
+        estimated_input_tokens: int,
+        estimated_output_tokens: int,
+        max_wait_time: float = 60.0,
+    ) -> None:
+        """Wait for capacity, then take a slot and reserve the estimated tokens."""
+        deadline = time.monotonic() + max_wait_time
+
+        try:
+            await asyncio.wait_for(self.slots.acquire(), timeout=max_wait_time)
+        except asyncio.TimeoutError:
+            await self._raise_timeout(max_wait_time)
+        self.concurrent_count += 1
+
+        try:
+            while not await self._try_reserve(
+                estimated_input_tokens, estimated_output_tokens
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    await self._raise_timeout(max_wait_time)
+                await asyncio.sleep(
+                    min(
+                        self.poll_interval,
+                        self._seconds_until_next_window(),
+                        remaining,
+                    )
                 )
+        except BaseException:
+            self.concurrent_count -= 1
+            self.slots.release()
+            raise
 
-            # Wait a bit before checking again
-            await asyncio.sleep(1.0)
-            logger.debug(
-                f"Waiting for rate limit capacity: "
-                f"{estimated_input_tokens} input + {estimated_output_tokens} output tokens"
+    async def release(
+        self,
+        actual_input_tokens: int,
+        actual_output_tokens: int,
+        estimated_input_tokens: int = 0,
+        estimated_output_tokens: int = 0,
+    ) -> None:
+        """Release a slot and settle reserved tokens against actual usage."""
+        self.concurrent_count = max(0, self.concurrent_count - 1)
+        self.slots.release()
+
+        # Settled against the current window, which may be newer than the reservation
+        input_delta = actual_input_tokens - estimated_input_tokens
+        output_delta = actual_output_tokens - estimated_output_tokens
+        if input_delta or output_delta:
+            await self._incr(input_delta, output_delta)
+
+    async def close(self) -> None:
+        """Close the Redis client and its connection pool."""
+        await self.redis.aclose()
+
+    async def _raise_timeout(self, max_wait_time: float) -> None:
+        usage = await self._get_current_usage()
+        raise RateLimitError(
+            f"Rate limit wait timeout after {max_wait_time}s. "
+            f"Current usage: {usage['input_tokens']}/{self.input_tokens_per_minute} input, "
+            f"{usage['output_tokens']}/{self.output_tokens_per_minute} output, "
+            f"{usage['concurrent']}/{self.max_concurrent} concurrent"
+        )
+
+
+class CircuitBreaker:
+    """
+    Fail fast while a provider is degraded.
+
+    Opens after fail_threshold failures within window seconds and rejects calls
+    for cooldown seconds. It then lets a single probe call through (half-open):
+    success closes it, failure opens it for another cooldown.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        fail_threshold: int = 5,
+        window: float = 30.0,
+        cooldown: float = 60.0,
+    ):
+        self.name = name or "provider"
+        self.fail_threshold = fail_threshold
+        self.window = window
+        self.cooldown = cooldown
+
+        self.failures: Deque[float] = deque()
+        self.opened_at: Optional[float] = None
+        # A probe that never reports back is given up on after a cooldown
+        self.probe_started_at: Optional[float] = None
+
+    def is_open(self) -> bool:
+        """Check whether calls are currently rejected."""
+        if self.opened_at is None:
+            return False
+
+        now = time.monotonic()
+        if now - self.opened_at < self.cooldown:
+            return True
+        return (
+            self.probe_started_at is not None
+            and now - self.probe_started_at < self.cooldown
+        )
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go ahead."""
+        if self.opened_at is None:
+            return
+
+        if self.is_open():
+            raise CircuitOpenError(
+                f"Circuit breaker for {self.name} is open; failing fast"
+            )
+
+        self.probe_started_at = time.monotonic()
+        logger.info(f"Circuit breaker for {self.name} half-open, sending a probe call")
+
+    def record_success(self) -> None:
+        """Record a call the provider answered, closing the breaker."""
+        if self.opened_at is not None:
+            logger.info(f"Circuit breaker for {self.name} closed")
+
+        self.failures.clear()
+        self.opened_at = None
+        self.probe_started_at = None
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the breaker past the threshold."""
+        now = time.monotonic()
+
+        if self.opened_at is not None:
+            # The half-open probe failed
+            self.opened_at = now
+            self.probe_started_at = None
+            logger.warning(f"Circuit breaker for {self.name} probe failed, reopened")
+            return
+
+        self.failures.append(now)
+        while self.failures and now - self.failures[0] > self.window:
+            self.failures.popleft()
+
+        if len(self.failures) >= self.fail_threshold:
+            self.opened_at = now
+            self.failures.clear()
+            logger.warning(
+                f"Circuit breaker for {self.name} opened after {self.fail_threshold} "
+                f"failures in {self.window}s; failing fast for {self.cooldown}s"
             )
 
 
 class RetryHandler:
     """Handler for retrying failed requests with exponential backoff."""
 
+    MAX_RETRIES_WITH_RETRY_AFTER = 5
+
     def __init__(self, max_retries: int = 2, base_delay: float = 5.0):
         self.max_retries = max_retries
         self.base_delay = base_delay
@@ -186,13 +592,76 @@ class RetryHandler:
 
         return any(indicator in error_str for indicator in rate_limit_indicators)
 
+    @staticmethod
+    def is_provider_fault(exception: Exception) -> bool:
+        """
+        Check if an exception means the provider is unhealthy.
+
+        Rate limits, server errors and connection failures count; other client
+        errors (bad request, auth) mean the provider answered.
+        """
+        status_code = getattr(exception, "status_code", None)
+        return status_code is None or status_code == 429 or status_code >= 500
+
+    @staticmethod
+    def get_retry_after(exception: Exception) -> Optional[float]:
+        """Get the wait in seconds the provider asked for, if any."""
+        headers = getattr(getattr(exception, "response", None), "headers", None)
+        if not headers:
+            return None
+
+        try:
+            retry_after_ms = headers.get("retry-after-ms")
+            if retry_after_ms is not None:
+                return float(retry_after_ms) / 1000
+
+            retry_after = headers.get("retry-after")
+            if retry_after is not None:
+                return float(retry_after)
+        except ValueError:
+            pass  # HTTP-date or malformed values fall back to backoff
+
+        return None
+
     async def retry_with_backoff(
-        self, func: Callable[[], Awaitable[T]], operation_name: str = "API call"
+        self,
+        func: Callable[[], Awaitable[T]],
+        operation_name: str = "API call",
+        breaker: Optional[CircuitBreaker] = None,
     ) -> T:
-        """Retry a function with exponential backoff on rate limit errors."""
+        """
+        Retry a function on rate limit errors.
+
+        Waits use full-jitter exponential backoff so concurrent callers don't
+        retry in lockstep, and never less than the provider's Retry-After. A
+        provider-supplied wait is exact, so it allows up to
+        MAX_RETRIES_WITH_RETRY_AFTER retries. If a circuit breaker is given,
+        it is checked once and told only the outcome after the last retry, so
+        rate limits that backoff rides out don't count as failures.
+        """
+        if breaker is None:
+            return await self._retry(func, operation_name)
+
+        breaker.before_call()
+        try:
+            result = await self._retry(func, operation_name)
+        except Exception as e:
+            if self.is_provider_fault(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+
+        breaker.record_success()
+        return result
+
+    async def _retry(self, func: Callable[[], Awaitable[T]], operation_name: str) -> T:
+        """Run the backoff loop of retry_with_backoff."""
         last_exception = None
+        max_retries = self.max_retries
+        attempt = 0
 
-        for attempt in range(self.max_retries + 1):  # +1 for initial attempt
+        while True:
             try:
                 return await func()
 
@@ -206,22 +675,28 @@ class RetryHandler:
                     )
                     raise e
 
+                retry_after = self.get_retry_after(e)
+                if retry_after is not None:
+                    max_retries = max(max_retries, self.MAX_RETRIES_WITH_RETRY_AFTER)
+
                 # Don't retry on the last attempt
-                if attempt >= self.max_retries:
+                if attempt >= max_retries:
                     logger.error(
-                        f"{operation_name} failed after {self.max_retries + 1} attempts "
+                        f"{operation_name} failed after {attempt + 1} attempts "
                         f"due to rate limiting: {e}"
                     )
                     break
 
-                # Calculate delay with exponential backoff
-                delay = self.base_delay * (2**attempt)
+                delay = random.uniform(0, self.base_delay * (2**attempt))
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
                 logger.warning(
                     f"{operation_name} hit rate limit (attempt {attempt + 1}), "
-                    f"retrying in {delay}s: {e}"
+                    f"retrying in {delay:.2f}s: {e}"
                 )
 
                 await asyncio.sleep(delay)
+                attempt += 1
 
         # If we get here, all retries failed
         if last_exception:
@@ -230,28 +705,159 @@ class RetryHandler:
             raise RateLimitError("All retry attempts failed")
 
 
-# Global instances
-rate_limiter = RateLimiter(
-    input_tokens_per_minute=settings.input_tokens_per_minute,
-    output_tokens_per_minute=settings.output_tokens_per_minute,
-    max_concurrent=settings.max_concurrent_requests,
-)
+def create_rate_limiter(
+    provider: str = "", model: str = ""
+) -> Union[RateLimiter, RedisRateLimiter]:
+    """Create a rate limiter for the configured backend and a provider's quota."""
+    input_tokens_per_minute = (
+        getattr(settings, f"{provider}_input_tokens_per_minute", None)
+        or settings.input_tokens_per_minute
+    )
+    output_tokens_per_minute = (
+        getattr(settings, f"{provider}_output_tokens_per_minute", None)
+        or settings.output_tokens_per_minute
+    )
+
+    if settings.rate_limiter_backend == RateLimiterBackend.REDIS:
+        return RedisRateLimiter(
+            redis_url=settings.redis_url,
+            input_tokens_per_minute=input_tokens_per_minute,
+            output_tokens_per_minute=output_tokens_per_minute,
+            max_concurrent=settings.max_concurrent_requests,
+            key_prefix=":".join(part for part in ("rl", provider, model) if part),
+        )
+
+    return RateLimiter(
+        input_tokens_per_minute=input_tokens_per_minute,
+        output_tokens_per_minute=output_tokens_per_minute,
+        max_concurrent=settings.max_concurrent_requests,
+    )
+
 
+# Rate limiters per (provider, model), since providers enforce quotas per model
+rate_limiters: Dict[Tuple[str, str], Union[RateLimiter, RedisRateLimiter]] = {}
+
+
+def get_rate_limiter(
+    provider: str = "", model: str = ""
+) -> Union[RateLimiter, RedisRateLimiter]:
+    """Get the rate limiter for a provider and model, creating it on first use."""
+    key = (provider, model)
+    limiter = rate_limiters.get(key)
+    if limiter is None:
+        limiter = create_rate_limiter(provider, model)
+        rate_limiters[key] = limiter
+    return limiter
+
+
+async def close_rate_limiters() -> None:
+    """Drop all rate limiters, closing the Redis clients of shared ones."""
+    limiters = list(rate_limiters.values())
+    rate_limiters.clear()
+    for limiter in limiters:
+        if isinstance(limiter, RedisRateLimiter):
+            try:
+                await limiter.close()
+            except Exception as e:
+                logger.warning(f"Failed to close Redis rate limiter: {e}")
+
+
+# Circuit breakers per provider, since outages affect all of a provider's models
+circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(provider: str = "") -> CircuitBreaker:
+    """Get the circuit breaker for a provider, creating it on first use."""
+    breaker = circuit_breakers.get(provider)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            name=provider,
+            fail_threshold=settings.circuit_breaker_fail_threshold,
+            window=settings.circuit_breaker_window_seconds,
+            cooldown=settings.circuit_breaker_cooldown_seconds,
+        )
+        circuit_breakers[provider] = breaker
+    return breaker
+
+
+# Global instances
 retry_handler = RetryHandler(
     max_retries=settings.max_retries, base_delay=settings.retry_delay_seconds
 )
 
 
-def estimate_tokens(text: str) -> int:
-    """Rough estimation of token count (4 characters ≈ 1 token)."""
-    return max(1, len(text) // 4)
+@lru_cache(maxsize=8)
+def _get_encoding(model: str) -> Any:
+    """
+    Get the tiktoken encoding for a model, or None to count tokens from bytes.
+
+    tiktoken downloads an encoding's BPE file on first use, so a failed load
+    (e.g. on an offline host) falls back too, and the None is cached rather
+    than retried on every call.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            # Not an OpenAI model (e.g. Claude); a modern BPE is still close
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(
+            f"Failed to load the tiktoken encoding for {model}, "
+            f"estimating tokens from bytes: {e}"
+        )
+        return None
+
+
+async def warm_up_token_counting(models: Iterable[str]) -> None:
+    """Load the encodings for models in a thread, so no request waits on it."""
+    for model in models:
+        await asyncio.to_thread(_get_encoding, model)
+
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Estimate the token count of text for a model.
+
+    Uses tiktoken when it is installed, otherwise assumes 4 UTF-8 bytes per
+    token, which keeps non-ASCII text from being badly under-counted.
+    """
+    encoding = _get_encoding(model) if model else None
+    if encoding is not None:
+        return max(1, len(encoding.encode(text, disallowed_special=())))
+
+    return max(1, len(text.encode("utf-8")) // 4)
+
+
+def estimate_tokens_batch(texts: List[str], model: Optional[str] = None) -> List[int]:
+    """
+    Estimate the token counts of many texts for a model.
+
+    With tiktoken this is a single encode_batch call, which tokenizes in
+    parallel in native code instead of once per text from Python.
+    """
+    encoding = _get_encoding(model) if model else None
+    if encoding is not None:
+        return [
+            max(1, len(tokens))
+            for tokens in encoding.encode_batch(texts, disallowed_special=())
+        ]
+
+    return [max(1, len(text.encode("utf-8")) // 4) for text in texts]
 
 
 async def with_rate_limiting_and_retry(
     func: Callable[[], Awaitable[T]],
     operation_name: str = "API call",
     input_text: str = "",
-    estimated_output_length: int = 500,
+    provider: str = "",
+    model: Optional[str] = None,
+    max_output_tokens: int = 500,
 ) -> T:
     """
     Execute a function with rate limiting and retry logic.
@@ -260,41 +866,100 @@ async def with_rate_limiting_and_retry(
         func: Async function to execute
         operation_name: Name for logging purposes
         input_text: Input text to estimate token count
-        estimated_output_length: Estimated output length in characters
+        provider: Provider the request goes to, used to pick the rate limiter
+        model: Model the request goes to, used to pick the rate limiter and tokenizer
+        max_output_tokens: Output token limit of the request, reserved up front
 
     Returns:
         Result from the function
     """
-    estimated_input_tokens = estimate_tokens(input_text)
-    estimated_output_tokens = estimate_tokens(" " * estimated_output_length)
+    breaker = get_circuit_breaker(provider)
+    if breaker.is_open():
+        # Don't wait for capacity just to be rejected
+        raise CircuitOpenError(f"Circuit breaker for {breaker.name} is open; failing fast")
 
-    # Wait for capacity
-    await rate_limiter.wait_for_capacity(
-        estimated_input_tokens, estimated_output_tokens
-    )
+    rate_limiter = get_rate_limiter(provider, model or "")
+    estimated_input_tokens = estimate_tokens(input_text, model)
+    estimated_output_tokens = max_output_tokens
 
-    # Acquire slot
+    # Wait for capacity and reserve the estimated tokens
     await rate_limiter.acquire(estimated_input_tokens, estimated_output_tokens)
 
     try:
         # Execute with retry logic
-        result = await retry_handler.retry_with_backoff(func, operation_name)
+        result = await retry_handler.retry_with_backoff(
+            func, operation_name, breaker
+        )
 
         # Record actual usage (estimate based on result if it's text)
         actual_output_tokens = estimated_output_tokens
         if hasattr(result, "__len__"):
             try:
-                actual_output_tokens = estimate_tokens(str(result))
+                actual_output_tokens = estimate_tokens(str(result), model)
             except (TypeError, ValueError):
                 pass  # Use estimation if conversion fails
 
-        await rate_limiter.release(estimated_input_tokens, actual_output_tokens)
+        await rate_limiter.release(
+            estimated_input_tokens,
+            actual_output_tokens,
+            estimated_input_tokens,
+            estimated_output_tokens,
+        )
 
         return result
 
     except Exception as e:
         # Release slot even on failure
         await rate_limiter.release(
-            estimated_input_tokens, 0
-        )  # No output tokens on failure
+            estimated_input_tokens,
+            0,  # No output tokens on failure
+            estimated_input_tokens,
+            estimated_output_tokens,
+        )
         raise e
+
+
+@asynccontextmanager
+async def rate_limited(
+    input_text: str = "",
+    provider: str = "",
+    model: Optional[str] = None,
+    max_output_tokens: int = 500,
+) -> AsyncIterator[List[str]]:
+    """
+    Hold a rate limiter reservation for the duration of a streamed call.
+
+    Streams can't be retried once output has been yielded, so there is no retry
+    logic here. Append the streamed chunks to the yielded list so the actual
+    output usage is recorded on release.
+    """
+    breaker = get_circuit_breaker(provider)
+    if breaker.is_open():
+        # Don't wait for capacity just to be rejected
+        raise CircuitOpenError(f"Circuit breaker for {breaker.name} is open; failing fast")
+
+    rate_limiter = get_rate_limiter(provider, model or "")
+    estimated_input_tokens = estimate_tokens(input_text, model)
+    await rate_limiter.acquire(estimated_input_tokens, max_output_tokens)
+
+    output: List[str] = []
+    try:
+        # Claim a half-open probe only once the call is actually about to run,
+        # so a rate limit timeout can't leave the probe claimed
+        breaker.before_call()
+        try:
+            yield output
+        except Exception as e:
+            if retry_handler.is_provider_fault(e):
+                breaker.record_failure()
+            raise
+        else:
+            breaker.record_success()
+    finally:
+        actual_output_tokens = estimate_tokens("".join(output), model) if output else 0
+        await rate_limiter.release(
+            estimated_input_tokens,
+            actual_output_tokens,
+            estimated_input_tokens,
+            max_output_tokens,
+        )
@@ -0,0 +1,108 @@
+"""
+On-disk cache of raw LLM provider responses.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+import orjson
+from app.core.config import CachePolicy, settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["CachePolicy", "ResponseCache", "ResponseCacheMiss", "response_cache"]
+
+
+class ResponseCacheMiss(Exception):
+    """Raised in replay mode when a response is not in the cache."""
+
+    pass
+
+
+class ResponseCache:
+    """
+    Content-addressed cache of provider responses.
+
+    Entries are stored as JSON files under <directory>/<2-char prefix>/<key>.json,
+    keyed by a SHA-256 of everything that determines the provider's output.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        policy: CachePolicy = CachePolicy.DISABLED,
+        max_temperature: float = 0.2,
+    ):
+        self.directory = Path(directory)
+        self.policy = policy
+        self.max_temperature = max_temperature
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a cache key from the parts of a provider call."""
+        return hashlib.sha256(
+            "|".join(str(part) for part in parts).encode("utf-8")
+        ).hexdigest()
+
+    def is_cacheable(self, temperature: float) -> bool:
+        """Check whether a call at this temperature may use the cache."""
+        return (
+            self.policy != CachePolicy.DISABLED
+            and temperature <= self.max_temperature
+        )
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _read(self, key: str) -> Optional[Any]:
+        try:
+            return orjson.loads(self._path(key).read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable response cache entry {key}: {e}")
+            return None
+
+    def _write(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so readers never see partial entries
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(orjson.dumps(value))
+        tmp_path.replace(path)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a cached response, or None on a miss."""
+        value = await asyncio.to_thread(self._read, key)
+        if value is None:
+            self.misses += 1
+            if self.policy == CachePolicy.REPLAY:
+                raise ResponseCacheMiss(f"No cached response for key {key}")
+            return None
+
+        self.hits += 1
+        return value
+
+    async def put(self, key: str, value: Any) -> None:
+        """Store a response unless the policy forbids writes."""
+        if self.policy != CachePolicy.ENABLED:
+            return
+
+        try:
+            await asyncio.to_thread(self._write, key, value)
+        except OSError as e:
+            logger.warning(f"Failed to write response cache entry {key}: {e}")
+
+
+# Global response cache instance
+response_cache = ResponseCache(
+    directory=settings.response_cache_dir,
+    policy=settings.response_cache_policy,
+    max_temperature=settings.response_cache_max_temperature,
+)
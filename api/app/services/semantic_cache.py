@@ -0,0 +1,147 @@
+"""
+Semantic cache of judge verdicts keyed by embedding similarity.
+"""
+
+import hashlib
+import logging
+import math
+import operator
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.provider_factory import ProviderFactory
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["SemanticVerdictCache", "semantic_cache"]
+
+Verdict = Tuple[float, str]
+
+
+def _normalize(vector: List[float]) -> Tuple[float, ...]:
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return tuple(value / norm for value in vector)
+
+
+def _dot(a: Tuple[float, ...], b: Tuple[float, ...]) -> float:
+    return sum(map(operator.mul, a, b))
+
+
+class SemanticVerdictCache:
+    """
+    Reuse judge verdicts for near-identical outputs.
+
+    Verdicts are grouped by scope (criterion, rubric, expected output and judge
+    model must match exactly). Within a scope, a verdict is reused when the
+    cosine similarity of the embedded (criterion, input, output) text reaches
+    the threshold. Each scope keeps at most max_entries verdicts in LRU order.
+
+    Embeddings always come from OpenAI, whichever provider judges, so the cache
+    stays disabled without an OpenAI API key.
+    """
+
+    def __init__(
+        self,
+        criteria: List[str],
+        api_key: str,
+        threshold: float = 0.97,
+        max_entries: int = 256,
+        embedding_model: str = "text-embedding-3-small",
+    ):
+        if criteria and not api_key:
+            logger.warning(
+                "Semantic cache criteria are set but no OpenAI API key is "
+                "configured for embeddings; the semantic cache is disabled"
+            )
+            criteria = []
+
+        self.criteria = frozenset(criteria)
+        self.api_key = api_key
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.embedding_model = embedding_model
+
+        self._scopes: Dict[str, OrderedDict[Tuple[float, ...], Verdict]] = {}
+        self._client: Optional["AsyncOpenAI"] = None
+        self.hits = 0
+        self.misses = 0
+
+    def is_enabled_for(self, criterion_name: str) -> bool:
+        """Check whether verdicts for this criterion may be reused."""
+        return criterion_name in self.criteria
+
+    @staticmethod
+    def make_scope(
+        criterion_name: str,
+        criterion_description: str,
+        expected_output: Optional[str],
+        evaluation_model: str,
+    ) -> str:
+        """Build the exact-match part of the cache key."""
+        return hashlib.sha256(
+            "|".join(
+                (
+                    criterion_name,
+                    criterion_description,
+                    expected_output or "",
+                    evaluation_model,
+                )
+            ).encode("utf-8")
+        ).hexdigest()
+
+    async def embed(self, text: str) -> Tuple[float, ...]:
+        """Embed text with the configured OpenAI embedding model."""
+        client = self._client
+        if client is None:
+            client = self._client = ProviderFactory.get_client("openai", self.api_key)
+
+        response = await client.embeddings.create(
+            model=self.embedding_model, input=text
+        )
+        return _normalize(response.data[0].embedding)
+
+    def lookup(self, scope: str, embedding: Tuple[float, ...]) -> Optional[Verdict]:
+        """Get the verdict of the most similar cached output, if close enough."""
+        entries = self._scopes.get(scope)
+        if not entries:
+            self.misses += 1
+            return None
+
+        best_key = None
+        best_similarity = self.threshold
+        for key in entries:
+            similarity = _dot(key, embedding)
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+
+        if best_key is None:
+            self.misses += 1
+            return None
+
+        entries.move_to_end(best_key)
+        self.hits += 1
+        logger.debug(f"Semantic cache hit (similarity={best_similarity:.3f})")
+        return entries[best_key]
+
+    def add(self, scope: str, embedding: Tuple[float, ...], verdict: Verdict) -> None:
+        """Store a verdict, evicting the least recently used one if full."""
+        entries = self._scopes.setdefault(scope, OrderedDict())
+        entries[embedding] = verdict
+        entries.move_to_end(embedding)
+
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+
+# Global semantic cache instance
+semantic_cache = SemanticVerdictCache(
+    criteria=settings.semantic_cache_criteria,
+    api_key=settings.openai_api_key,
+    threshold=settings.semantic_cache_threshold,
+    max_entries=settings.semantic_cache_max_entries,
+    embedding_model=settings.semantic_cache_embedding_model,
+)
@@ -17,5 +17,6 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        workers=None if settings.debug else settings.workers,
         log_level=settings.log_level.lower(),
     )
@@ -0,0 +1,231 @@
+import httpx
+import orjson
+import pytest
+import pytest_asyncio
+from anthropic import AsyncAnthropic
+from app.core.config import settings
+from app.services import rate_limiter
+from app.services.llm_providers import ClaudeProvider, OpenAIProvider
+from main import app
+from openai import AsyncOpenAI
+
+FAKE_CHUNKS = ["Paris is", " the capital", " of France."]
+FAKE_OUTPUT = "".join(FAKE_CHUNKS)
+FAKE_VERDICT = {"reasoning": "Clear and correct.", "score": 0.8}
+
+
+def _sse(events):
+    """Encode (event name, payload) pairs as a server-sent event stream."""
+    body = b""
+    for name, data in events:
+        if name:
+            body += b"event: " + name.encode() + b"\n"
+        payload = data if isinstance(data, bytes) else orjson.dumps(data)
+        body += b"data: " + payload + b"\n\n"
+    return httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, content=body
+    )
+
+
+def _openai_stream(body):
+    """Canned Chat Completions stream of FAKE_CHUNKS."""
+
+    def chunk(delta, finish_reason=None):
+        return {
+            "id": "chatcmpl-test",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    return _sse(
+        [(None, chunk({"role": "assistant", "content": ""}))]
+        + [(None, chunk({"content": text})) for text in FAKE_CHUNKS]
+        + [(None, chunk({}, "stop")), (None, b"[DONE]")]
+    )
+
+
+def _anthropic_stream(body):
+    """Canned Messages stream of FAKE_CHUNKS."""
+    message = {
+        "id": "msg_test",
+        "type": "message",
+        "role": "assistant",
+        "content": [],
+        "model": body["model"],
+        "stop_reason": None,
+        "stop_sequence": None,
+        "usage": {"input_tokens": 1, "output_tokens": 1},
+    }
+    block = {"type": "text", "text": ""}
+    return _sse(
+        [
+            ("message_start", {"type": "message_start", "message": message}),
+            (
+                "content_block_start",
+                {"type": "content_block_start", "index": 0, "content_block": block},
+            ),
+        ]
+        + [
+            (
+                "content_block_delta",
+                {
+                    "type": "content_block_delta",
+                    "index": 0,
+                    "delta": {"type": "text_delta", "text": text},
+                },
+            )
+            for text in FAKE_CHUNKS
+        ]
+        + [
+            ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+            (
+                "message_delta",
+                {
+                    "type": "message_delta",
+                    "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                    "usage": {"output_tokens": 1},
+                },
+            ),
+            ("message_stop", {"type": "message_stop"}),
+        ]
+    )
+
+
+def _openai_response(body):
+    """Canned Chat Completions response: a generation or a judge verdict."""
+    if body.get("stream"):
+        return _openai_stream(body)
+    if "response_format" not in body:
+        content = FAKE_OUTPUT
+    elif body["response_format"]["json_schema"]["name"] == "verdict":
+        content = orjson.dumps(FAKE_VERDICT).decode()
+    else:
+        content = orjson.dumps({"verdicts": []}).decode()
+    message = {"role": "assistant", "content": content}
+    return httpx.Response(
+        200,
+        json={
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+        },
+    )
+
+
+def _anthropic_response(body):
+    """Canned Messages response: a generation or a verdict tool call."""
+    if body.get("stream"):
+        return _anthropic_stream(body)
+    if "tools" in body:
+        block = {
+            "type": "tool_use",
+            "id": "toolu_test",
+            "name": "verdict",
+            "input": FAKE_VERDICT,
+        }
+        stop_reason = "tool_use"
+    else:
+        block = {"type": "text", "text": FAKE_OUTPUT}
+        stop_reason = "end_turn"
+    return httpx.Response(
+        200,
+        json={
+            "id": "msg_test",
+            "type": "message",
+            "role": "assistant",
+            "content": [block],
+            "model": body["model"],
+            "stop_reason": stop_reason,
+            "stop_sequence": None,
+            "usage": {"input_tokens": 1, "output_tokens": 1},
+        },
+    )
+
+
+def _handle_provider_request(request):
+    """Route an outbound SDK request to its canned response."""
+    body = orjson.loads(request.content)
+    if request.url.path.endswith("/chat/completions"):
+        return _openai_response(body)
+    if request.url.path.endswith("/messages"):
+        return _anthropic_response(body)
+    return httpx.Response(404, json={"error": f"unexpected request {request.url}"})
+
+
+PROVIDER_TRANSPORT = httpx.MockTransport(_handle_provider_request)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fake_providers():
+    """Answer every provider SDK request in-process instead of over the network."""
+
+    def openai_client(api_key):
+        http_client = httpx.AsyncClient(transport=PROVIDER_TRANSPORT)
+        return AsyncOpenAI(api_key="test-key", http_client=http_client)
+
+    def anthropic_client(api_key):
+        http_client = httpx.AsyncClient(transport=PROVIDER_TRANSPORT)
+        return AsyncAnthropic(api_key="test-key", http_client=http_client)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(OpenAIProvider, "create_client", staticmethod(openai_client))
+        mp.setattr(ClaudeProvider, "create_client", staticmethod(anthropic_client))
+        # Fake calls cost nothing, so don't throttle them
+        mp.setattr(settings, "input_tokens_per_minute", 10_000_000)
+        mp.setattr(settings, "output_tokens_per_minute", 10_000_000)
+        yield
+
+
+class FakeClock:
+    """Stand-in for the time module whose clock only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze the rate limiter's clock; tests move it with clock.advance."""
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", fake)
+    return fake
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client():
+    """Share one async client (and one app lifespan) across the test session."""
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as c:
+            yield c
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def sample_evaluate_response(client):
+    """Raw body of one successful single-generation evaluation, run once per session."""
+    response = await client.post(
+        "/api/v1/evaluate",
+        json={
+            "prompts": ["Test prompt"],
+            "test_input": "Test input",
+            "generation_count": 1,
+            "evaluation_count": 1,
+        },
+    )
+    response.raise_for_status()
+    return response.content
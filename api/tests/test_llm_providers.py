@@ -0,0 +1,228 @@
+from types import SimpleNamespace
+
+import anthropic
+import httpx
+import openai
+import orjson
+import pytest
+from app.core.config import settings
+from app.services import rate_limiter
+from app.services.llm_providers import ClaudeProvider, OpenAIProvider
+from app.services.rate_limiter import CircuitBreaker, RateLimiter, estimate_tokens
+from tests.conftest import FAKE_CHUNKS, FAKE_OUTPUT
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+# (provider class, model, SDK client class, SDK server error)
+PROVIDERS = [
+    pytest.param(
+        OpenAIProvider,
+        "gpt-4o",
+        openai.AsyncOpenAI,
+        openai.InternalServerError,
+        id="openai",
+    ),
+    pytest.param(
+        ClaudeProvider,
+        "claude-3-5-haiku-20241022",
+        anthropic.AsyncAnthropic,
+        anthropic.InternalServerError,
+        id="claude",
+    ),
+]
+
+
+@pytest.fixture
+def isolated_limits(monkeypatch, clock):
+    """Give a provider and model their own rate limiter and circuit breaker."""
+
+    def install(provider_name, model):
+        # The frozen clock stops refills, so settled counts are exact
+        limiter = RateLimiter(input_tokens_per_minute=600, output_tokens_per_minute=600)
+        breaker = CircuitBreaker(name=provider_name)
+        monkeypatch.setitem(rate_limiter.rate_limiters, (provider_name, model), limiter)
+        monkeypatch.setitem(rate_limiter.circuit_breakers, provider_name, breaker)
+        return limiter, breaker
+
+    return install
+
+
+def server_error_client(sdk_client_cls):
+    """Build an SDK client whose every request fails with a 500, unretried."""
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(500, json={"error": {"message": "boom"}})
+    )
+    return sdk_client_cls(
+        api_key="test-key",
+        http_client=httpx.AsyncClient(transport=transport),
+        max_retries=0,
+    )
+
+
+@pytest.mark.parametrize("provider_cls,model,sdk_client_cls,sdk_error", PROVIDERS)
+async def test_stream_yields_chunks_and_settles_reservation(
+    isolated_limits, provider_cls, model, sdk_client_cls, sdk_error
+):
+    """Test streamed chunks pass through and the reservation settles on actual output."""
+    provider = provider_cls("test-key", model=model)
+    limiter, breaker = isolated_limits(provider.provider_name, model)
+    breaker.record_failure()  # Cleared by the successful stream
+
+    chunks = [
+        chunk
+        async for chunk in provider.generate_response_stream(
+            "Test prompt", "Test input"
+        )
+    ]
+
+    assert chunks == FAKE_CHUNKS
+    assert limiter.concurrent_count == 0
+    # The output reservation is settled down to what was actually streamed
+    usage = limiter._get_current_usage()
+    assert usage["output_tokens"] == estimate_tokens(FAKE_OUTPUT, model)
+    assert not breaker.failures
+
+
+@pytest.mark.parametrize("provider_cls,model,sdk_client_cls,sdk_error", PROVIDERS)
+async def test_stream_failure_releases_reservation(
+    isolated_limits, provider_cls, model, sdk_client_cls, sdk_error
+):
+    """Test a failed stream frees its slot, refunds its tokens and trips the breaker."""
+    provider = provider_cls(
+        "test-key", model=model, client=server_error_client(sdk_client_cls)
+    )
+    limiter, breaker = isolated_limits(provider.provider_name, model)
+
+    with pytest.raises(sdk_error):
+        async for _ in provider.generate_response_stream("Test prompt", "Test input"):
+            pass
+
+    assert limiter.concurrent_count == 0
+    assert limiter._get_current_usage()["output_tokens"] == 0
+    assert len(breaker.failures) == 1
+
+
+class FakeBatchAPI:
+    """Stand-in for the files and batches resources of an AsyncOpenAI client."""
+
+    def __init__(self, statuses, answer=None):
+        # Status of the batch when created, then after each retrieve
+        self.statuses = list(statuses)
+        # Maps one uploaded request to its output record, or None to drop it
+        self.answer = answer
+        self.requests = []
+        self.cancelled = False
+        self.files = SimpleNamespace(create=self._upload, content=self._download)
+        self.batches = SimpleNamespace(
+            create=self._create, retrieve=self._retrieve, cancel=self._cancel
+        )
+
+    def _batch(self):
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        output_file_id = "file-out" if status == "completed" else None
+        return SimpleNamespace(
+            id="batch-1", status=status, output_file_id=output_file_id
+        )
+
+    async def _upload(self, file, purpose):
+        _, content = file
+        self.requests = [orjson.loads(line) for line in content.splitlines()]
+        return SimpleNamespace(id="file-in")
+
+    async def _create(self, input_file_id, endpoint, completion_window):
+        return self._batch()
+
+    async def _retrieve(self, batch_id):
+        return self._batch()
+
+    async def _cancel(self, batch_id):
+        self.cancelled = True
+
+    async def _download(self, file_id):
+        records = [self.answer(request) for request in self.requests]
+        lines = [orjson.dumps(record) for record in records if record is not None]
+        return SimpleNamespace(text=b"\n".join(lines).decode())
+
+
+def batch_record(request, status_code=200):
+    """Build the output line the Batch API writes for one request."""
+    content = "batch " + request["body"]["messages"][1]["content"]
+    body = {"choices": [{"message": {"role": "assistant", "content": content}}]}
+    return {
+        "custom_id": request["custom_id"],
+        "response": {"status_code": status_code, "body": body},
+        "error": None,
+    }
+
+
+@pytest.fixture
+def batch_provider(monkeypatch):
+    """Build an OpenAIProvider on a FakeBatchAPI whose single calls are faked."""
+    monkeypatch.setattr(settings, "batch_api_min_items", 2)
+    monkeypatch.setattr(settings, "batch_poll_interval_seconds", 0)
+
+    def build(batch_api):
+        provider = OpenAIProvider("test-key", model="gpt-4o", client=batch_api)
+
+        async def generate_response(prompt, test_input):
+            if test_input == "boom":
+                raise RuntimeError("boom")
+            return f"live {test_input}"
+
+        monkeypatch.setattr(provider, "generate_response", generate_response)
+        return provider
+
+    return build
+
+
+async def test_batch_generate_uses_batch_output(batch_provider):
+    """Test the JSONL sent to the Batch API and parsing of its output."""
+
+    def answer(request):
+        if request["custom_id"] == "1":
+            return batch_record(request, status_code=500)
+        if request["custom_id"] == "2":
+            return None
+        return batch_record(request)
+
+    batch_api = FakeBatchAPI(["validating", "in_progress", "completed"], answer)
+    provider = batch_provider(batch_api)
+    items = [("Prompt", "a"), ("Prompt", "b"), ("Prompt", "c"), ("Prompt", "d")]
+
+    results = await provider.batch_generate(items)
+
+    # Items the batch failed or dropped are generated individually
+    assert results == ["batch a", "live b", "live c", "batch d"]
+    custom_ids = [request["custom_id"] for request in batch_api.requests]
+    assert custom_ids == ["0", "1", "2", "3"]
+    request = batch_api.requests[0]
+    assert request["method"] == "POST"
+    assert request["url"] == "/v1/chat/completions"
+    assert request["body"]["model"] == "gpt-4o"
+    assert request["body"]["messages"] == [
+        {"role": "system", "content": "Prompt"},
+        {"role": "user", "content": "a"},
+    ]
+
+
+@pytest.mark.parametrize("status", ["failed", "expired", "cancelled"])
+async def test_batch_generate_falls_back_when_batch_fails(batch_provider, status):
+    """Test a failed batch still answers every item with its output or exception."""
+    provider = batch_provider(FakeBatchAPI(["in_progress", status]))
+
+    results = await provider.batch_generate([("Prompt", "a"), ("Prompt", "boom")])
+
+    assert results[0] == "live a"
+    assert isinstance(results[1], RuntimeError)
+
+
+async def test_batch_generate_cancels_batch_past_deadline(batch_provider, monkeypatch):
+    """Test a batch outliving batch_max_wait_seconds is cancelled, not awaited."""
+    monkeypatch.setattr(settings, "batch_max_wait_seconds", 0)
+    batch_api = FakeBatchAPI(["in_progress"])
+    provider = batch_provider(batch_api)
+
+    results = await provider.batch_generate([("Prompt", "a"), ("Prompt", "b")])
+
+    assert batch_api.cancelled
+    assert results == ["live a", "live b"]
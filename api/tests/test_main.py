@@ -1,246 +1,251 @@
+import asyncio
+import re
+from typing import Annotated, Any, Dict, List
+
+import httpx
+import orjson
 import pytest
-from fastapi.testclient import TestClient
+from app.core.models import PromptEvaluationRequest
+from app.db.database import get_database
 from main import app
-
-client = TestClient(app)
+from pydantic import BaseModel, Field, TypeAdapter
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+# Absolute URLs, parsed once; httpx sends them as-is instead of joining each
+# request path onto the client's base URL
+ROOT_URL = httpx.URL("http://testserver/api/v1/")
+HEALTH_URL = ROOT_URL.join("health")
+EVALUATE_URL = ROOT_URL.join("evaluate")
+PROVIDER_INFO_URL = ROOT_URL.join("provider-info")
+EVALUATIONS_URL = ROOT_URL.join("evaluations")
+
+BASE_PAYLOAD = {"prompts": ["Test prompt"], "test_input": "Test input"}
+JSON_HEADERS = {"content-type": "application/json"}
+
+# Requests expected to run the full pipeline, pre-serialized once:
+# (case, body, expected generation_count, expected evaluation_count)
+COUNT_CASES = [
+    (
+        "valid-request",
+        orjson.dumps(
+            {
+                "prompts": ["You are a helpful assistant."],
+                "test_input": "What is 2+2?",
+            }
+        ),
+        3,
+        3,
+    ),
+    ("default-counts", orjson.dumps(BASE_PAYLOAD), 3, 3),
+] + [
+    (
+        f"counts-{generation_count}x{evaluation_count}",
+        orjson.dumps(
+            {
+                **BASE_PAYLOAD,
+                "generation_count": generation_count,
+                "evaluation_count": evaluation_count,
+            }
+        ),
+        generation_count,
+        evaluation_count,
+    )
+    for generation_count, evaluation_count in [(2, 2), (1, 1), (10, 10)]
+]
+
+
+def _invalid_request_cases():
+    """Build one out-of-range value per bound declared on the request model."""
+    cases = []
+    for name, field in PromptEvaluationRequest.model_fields.items():
+        for constraint in field.metadata:
+            if hasattr(constraint, "ge"):
+                bound = constraint.ge
+                value, msg = bound - 1, f"greater than or equal to {bound}"
+                case_id = f"{name}-below-min"
+            elif hasattr(constraint, "le"):
+                bound = constraint.le
+                value, msg = bound + 1, f"less than or equal to {bound}"
+                case_id = f"{name}-above-max"
+            elif hasattr(constraint, "min_length"):
+                bound = constraint.min_length
+                value, msg = ["Test prompt"] * (bound - 1), f"at least {bound} item"
+                case_id = f"{name}-too-few"
+            elif hasattr(constraint, "max_length"):
+                bound = constraint.max_length
+                value, msg = ["Test prompt"] * (bound + 1), f"at most {bound} item"
+                case_id = f"{name}-too-many"
+            else:
+                continue
+            pattern = re.compile(re.escape(msg).encode())
+            cases.append(pytest.param(name, value, pattern, id=case_id))
+    return cases
+
+
+# Derived from the model so the tests can't drift from its Field constraints
+INVALID_REQUEST_CASES = _invalid_request_cases()
+
+
+# Expected shape of a successful /evaluate response; every key is required and
+# each nested list must be non-empty
+class GenerationShape(BaseModel):
+    generation_id: str
+    output: str
+    generation_time: float
+
+
+class EvaluationShape(BaseModel):
+    evaluation_id: str
+    scores: Dict[str, float]
+    reasoning: Dict[str, str]
+    evaluation_time: float
+
+
+class GenerationEvaluationShape(BaseModel):
+    generation_result: GenerationShape
+    evaluation_results: Annotated[List[EvaluationShape], Field(min_length=1)]
+    aggregated_scores: Dict[str, float]
+    aggregated_reasoning: Dict[str, List[str]]
+
+
+class PromptResultShape(BaseModel):
+    prompt_id: str
+    prompt: str
+    generation_evaluation_results: Annotated[
+        List[GenerationEvaluationShape], Field(min_length=1)
+    ]
+    final_scores: Dict[str, float]
+    total_score: float
+    execution_time: float
+    generation_count: int
+    evaluation_count: int
+
+
+class EvaluateResponseShape(BaseModel):
+    evaluation_id: str
+    timestamp: str
+    results: Annotated[List[PromptResultShape], Field(min_length=1)]
+    criteria: List[Any]
+    status: str
+
+
+# Compiled once at import; validation runs inside pydantic-core
+EVALUATE_RESPONSE_VALIDATOR = TypeAdapter(EvaluateResponseShape)
+
+HISTORY_ROWS = [
+    {"id": 2, "evaluation_id": "eval-2"},
+    {"id": 1, "evaluation_id": "eval-1"},
+]
+
+
+class FakeHistoryDB:
+    """History store that yields canned rows, then optionally fails."""
+
+    def __init__(self, rows, error=None):
+        self.rows = rows
+        self.error = error
+
+    async def iter_recent_evaluations(self, limit=10, batch_size=10):
+        for row in self.rows[:limit]:
+            yield row
+        if self.error is not None:
+            raise self.error
+
+
+@pytest.fixture
+def history_db():
+    """Serve /evaluations from a FakeHistoryDB built by the test."""
+
+    def install(rows, error=None):
+        fake = FakeHistoryDB(rows, error)
+        app.dependency_overrides[get_database] = lambda: fake
+
+    yield install
+    app.dependency_overrides.pop(get_database, None)
 
 
-def test_root_endpoint():
+async def test_root_endpoint(client):
     """Test the root endpoint."""
-    response = client.get("/api/v1/")
+    response = await client.get(ROOT_URL)
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     assert "message" in data
     assert "version" in data
     assert data["message"] == "LLM Tournament API"
 
 
-def test_health_endpoint():
+async def test_health_endpoint(client):
     """Test the health check endpoint."""
-    response = client.get("/api/v1/health")
+    response = await client.get(HEALTH_URL)
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     assert "status" in data
     assert "timestamp" in data
     assert "version" in data
 
 
-def test_evaluate_endpoint_no_prompts():
-    """Test evaluation endpoint with no prompts."""
-    response = client.post(
-        "/api/v1/evaluate",
-        json={"prompts": [], "test_input": "What is the capital of France?"},
-    )
-    assert response.status_code == 422
-    detail = response.json()["detail"]
-    assert isinstance(detail, list) and len(detail) > 0
-    assert "List should have at least 1 item" in detail[0]["msg"]
-
-
-def test_evaluate_endpoint_too_many_prompts():
-    """Test evaluation endpoint with too many prompts."""
-    prompts = ["Test prompt"] * 15  # More than max allowed
-    response = client.post(
-        "/api/v1/evaluate",
-        json={"prompts": prompts, "test_input": "What is the capital of France?"},
-    )
-    assert response.status_code == 422
-    detail = response.json()["detail"]
-    assert isinstance(detail, list) and len(detail) > 0
-    assert "List should have at most 10 items" in detail[0]["msg"]
-
-
-@pytest.mark.asyncio
-async def test_evaluate_endpoint_valid_request():
-    """Test evaluation endpoint with valid request."""
-    # This test requires a valid OpenAI API key
-    # In a real test environment, you would mock the OpenAI client
-    prompts = ["You are a helpful assistant."]
-    response = client.post(
-        "/api/v1/evaluate", json={"prompts": prompts, "test_input": "What is 2+2?"}
-    )
-
-    # Without a valid API key, this will fail with 422 or 500
-    # In production tests, mock the OpenAI client
-    assert response.status_code in [422, 500] or response.status_code == 200
-
-
-def test_evaluate_endpoint_with_generation_counts():
-    """Test evaluation endpoint with custom generation and evaluation counts."""
-    response = client.post(
-        "/api/v1/evaluate",
-        json={
-            "prompts": ["Test prompt"],
-            "test_input": "Test input",
-            "generation_count": 2,
-            "evaluation_count": 2,
-        },
-    )
-    # Should succeed in validation (actual evaluation may fail without API key)
-    assert response.status_code in [422, 500] or response.status_code == 200
-
-    # If successful, check response structure
-    if response.status_code == 200:
-        data = response.json()
-        assert "results" in data
-        assert len(data["results"]) == 1
-        result = data["results"][0]
-        assert "generation_count" in result
-        assert "evaluation_count" in result
-        assert result["generation_count"] == 2
-        assert result["evaluation_count"] == 2
-
-
-def test_evaluate_endpoint_generation_count_bounds():
-    """Test evaluation endpoint with generation count boundary values."""
-    # Test minimum value
-    response = client.post(
-        "/api/v1/evaluate",
-        json={
-            "prompts": ["Test prompt"],
-            "test_input": "Test input",
-            "generation_count": 1,
-            "evaluation_count": 1,
-        },
-    )
-    assert response.status_code in [422, 500] or response.status_code == 200
-
-    # Test maximum value
-    response = client.post(
-        "/api/v1/evaluate",
+@pytest.mark.validation
+async def test_evaluate_endpoint_too_many_llm_calls(client):
+    """Test evaluation endpoint rejects requests exceeding the LLM call budget."""
+    response = await client.post(
+        EVALUATE_URL,
         json={
-            "prompts": ["Test prompt"],
-            "test_input": "Test input",
+            **BASE_PAYLOAD,
+            "prompts": ["Test prompt"] * 10,
             "generation_count": 10,
             "evaluation_count": 10,
         },
     )
-    assert response.status_code in [422, 500] or response.status_code == 200
-
-
-def test_evaluate_endpoint_invalid_generation_counts():
-    """Test evaluation endpoint with invalid generation and evaluation counts."""
-    # Test generation_count too low
-    response = client.post(
-        "/api/v1/evaluate",
-        json={
-            "prompts": ["Test prompt"],
-            "test_input": "Test input",
-            "generation_count": 0,
-        },
+    assert response.status_code == 400
+    assert "LLM calls" in orjson.loads(response.content)["detail"]
+
+
+@pytest.mark.pipeline
+async def test_evaluate_endpoint_counts(client):
+    """Test evaluation endpoint runs the requested generations and evaluations."""
+    responses = await asyncio.gather(
+        *[
+            client.post(EVALUATE_URL, content=body, headers=JSON_HEADERS)
+            for _, body, _, _ in COUNT_CASES
+        ]
     )
+    for (case, _, generation_count, evaluation_count), response in zip(
+        COUNT_CASES, responses
+    ):
+        assert response.status_code == 200, f"{case}: {response.text}"
+        data = EVALUATE_RESPONSE_VALIDATOR.validate_json(response.content)
+        assert len(data.results) == 1, case
+        result = data.results[0]
+        assert result.generation_count == generation_count, case
+        assert result.evaluation_count == evaluation_count, case
+        assert len(result.generation_evaluation_results) == generation_count, case
+        for gen_eval_result in result.generation_evaluation_results:
+            assert len(gen_eval_result.evaluation_results) == evaluation_count, case
+
+
+@pytest.mark.validation
+@pytest.mark.parametrize("field,value,expected_error", INVALID_REQUEST_CASES)
+async def test_evaluate_endpoint_invalid_values(client, field, value, expected_error):
+    """Test evaluation endpoint rejects values outside the request model's bounds."""
+    payload = {**BASE_PAYLOAD, field: value}
+    response = await client.post(EVALUATE_URL, json=payload)
     assert response.status_code == 422
-    detail = response.json()["detail"]
-    assert isinstance(detail, list) and len(detail) > 0
-    assert "greater than or equal to 1" in detail[0]["msg"]
+    assert expected_error.search(response.content)
 
-    # Test generation_count too high
-    response = client.post(
-        "/api/v1/evaluate",
-        json={
-            "prompts": ["Test prompt"],
-            "test_input": "Test input",
-            "generation_count": 15,
-        },
-    )
-    assert response.status_code == 422
-    detail = response.json()["detail"]
-    assert isinstance(detail, list) and len(detail) > 0
-    assert "less than or equal to 10" in detail[0]["msg"]
 
-    # Test evaluation_count too low
-    response = client.post(
-        "/api/v1/evaluate",
-        json={
-            "prompts": ["Test prompt"],
-            "test_input": "Test input",
-            "evaluation_count": 0,
-        },
-    )
-    assert response.status_code == 422
-    detail = response.json()["detail"]
-    assert isinstance(detail, list) and len(detail) > 0
-    assert "greater than or equal to 1" in detail[0]["msg"]
-
-
-def test_evaluate_endpoint_default_counts():
-    """Test evaluation endpoint uses default generation and evaluation counts."""
-    response = client.post(
-        "/api/v1/evaluate",
-        json={"prompts": ["Test prompt"], "test_input": "Test input"},
-    )
-    # Should succeed in validation (actual evaluation may fail without API key)
-    assert response.status_code in [422, 500] or response.status_code == 200
-
-    # If successful, check default values
-    if response.status_code == 200:
-        data = response.json()
-        result = data["results"][0]
-        assert result["generation_count"] == 3  # Default value
-        assert result["evaluation_count"] == 3  # Default value
-
-
-def test_evaluate_response_structure():
+@pytest.mark.pipeline
+async def test_evaluate_response_structure(sample_evaluate_response):
     """Test the structure of evaluation response with new fields."""
-    response = client.post(
-        "/api/v1/evaluate",
-        json={
-            "prompts": ["Test prompt"],
-            "test_input": "Test input",
-            "generation_count": 1,
-            "evaluation_count": 1,
-        },
-    )
+    EVALUATE_RESPONSE_VALIDATOR.validate_json(sample_evaluate_response)
+
 
-    # If successful, validate complete response structure
-    if response.status_code == 200:
-        data = response.json()
-
-        # Top-level response structure
-        assert "evaluation_id" in data
-        assert "timestamp" in data
-        assert "results" in data
-        assert "criteria" in data
-        assert "status" in data
-
-        # Result structure
-        result = data["results"][0]
-        assert "prompt_id" in result
-        assert "prompt" in result
-        assert "generation_evaluation_results" in result
-        assert "final_scores" in result
-        assert "total_score" in result
-        assert "execution_time" in result
-        assert "generation_count" in result
-        assert "evaluation_count" in result
-
-        # Generation evaluation result structure
-        gen_eval_result = result["generation_evaluation_results"][0]
-        assert "generation_result" in gen_eval_result
-        assert "evaluation_results" in gen_eval_result
-        assert "aggregated_scores" in gen_eval_result
-        assert "aggregated_reasoning" in gen_eval_result
-
-        # Generation result structure
-        gen_result = gen_eval_result["generation_result"]
-        assert "generation_id" in gen_result
-        assert "output" in gen_result
-        assert "generation_time" in gen_result
-
-        # Evaluation result structure
-        eval_result = gen_eval_result["evaluation_results"][0]
-        assert "evaluation_id" in eval_result
-        assert "scores" in eval_result
-        assert "reasoning" in eval_result
-        assert "evaluation_time" in eval_result
-
-
-def test_provider_info_endpoint():
+async def test_provider_info_endpoint(client):
     """Test the provider info endpoint."""
-    response = client.get("/api/v1/provider-info")
+    response = await client.get(PROVIDER_INFO_URL)
     assert response.status_code == 200
 
-    data = response.json()
+    data = orjson.loads(response.content)
     assert "current_providers" in data
     assert "configured_provider" in data
     assert "available_providers" in data
@@ -248,3 +253,36 @@ def test_provider_info_endpoint():
     # Should show available providers
     assert "openai" in data["available_providers"]
     assert "claude" in data["available_providers"]
+
+
+async def test_recent_evaluations_streams_rows(client, history_db):
+    """Test recent evaluations stream as a JSON array or as NDJSON."""
+    history_db(HISTORY_ROWS)
+
+    response = await client.get(EVALUATIONS_URL)
+    assert response.status_code == 200
+    assert orjson.loads(response.content) == HISTORY_ROWS
+
+    response = await client.get(
+        EVALUATIONS_URL, headers={"accept": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    lines = response.content.splitlines()
+    assert [orjson.loads(line) for line in lines] == HISTORY_ROWS
+
+
+async def test_recent_evaluations_query_failure(client, history_db):
+    """Test a failing history query is a 500, not an empty 200."""
+    history_db([], error=RuntimeError("database is down"))
+
+    response = await client.get(EVALUATIONS_URL)
+    assert response.status_code == 500
+    assert orjson.loads(response.content)["detail"] == "Failed to retrieve evaluations"
+
+
+async def test_recent_evaluations_mid_stream_failure(client, history_db):
+    """Test an error after the first row aborts the stream instead of closing it."""
+    history_db(HISTORY_ROWS, error=RuntimeError("connection lost"))
+
+    with pytest.raises(RuntimeError, match="connection lost"):
+        await client.get(EVALUATIONS_URL)
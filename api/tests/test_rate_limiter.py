@@ -0,0 +1,403 @@
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+from app.services import rate_limiter
+from app.services.rate_limiter import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RateLimiter,
+    RateLimitError,
+    RedisRateLimiter,
+    RetryHandler,
+    close_rate_limiters,
+    estimate_tokens,
+    warm_up_token_counting,
+)
+
+
+class ProviderError(Exception):
+    """Provider SDK error carrying an HTTP status, like openai.APIStatusError."""
+
+    def __init__(self, status_code, message=""):
+        super().__init__(message or f"Error code: {status_code}")
+        self.status_code = status_code
+
+
+def rate_limit_error():
+    return ProviderError(429, "Error code: 429 - rate limit exceeded")
+
+
+def failing(*errors, result="ok"):
+    """Build an async callable that raises each error in turn, then returns."""
+    remaining = list(errors)
+    calls = []
+
+    async def func():
+        calls.append(None)
+        if remaining:
+            raise remaining.pop(0)
+        return result
+
+    func.calls = calls
+    return func
+
+
+def test_breaker_opens_at_threshold(clock):
+    breaker = CircuitBreaker(fail_threshold=3, window=30, cooldown=60)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert not breaker.is_open()
+    breaker.before_call()
+
+    breaker.record_failure()
+    assert breaker.is_open()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_forgets_failures_outside_window(clock):
+    breaker = CircuitBreaker(fail_threshold=2, window=30, cooldown=60)
+
+    breaker.record_failure()
+    clock.advance(31)
+    breaker.record_failure()
+    assert not breaker.is_open()
+
+
+def test_breaker_success_resets_failures(clock):
+    breaker = CircuitBreaker(fail_threshold=2, window=30, cooldown=60)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert not breaker.is_open()
+
+
+def test_breaker_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(fail_threshold=1, window=30, cooldown=60)
+    breaker.record_failure()
+
+    clock.advance(59)
+    assert breaker.is_open()
+
+    clock.advance(1)
+    assert not breaker.is_open()
+    breaker.before_call()  # Claims the probe
+
+    assert breaker.is_open()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_probe_success_closes(clock):
+    breaker = CircuitBreaker(fail_threshold=1, window=30, cooldown=60)
+    breaker.record_failure()
+    clock.advance(60)
+    breaker.before_call()
+
+    breaker.record_success()
+    assert not breaker.is_open()
+    breaker.before_call()
+    breaker.before_call()
+
+
+def test_breaker_probe_failure_reopens_for_cooldown(clock):
+    breaker = CircuitBreaker(fail_threshold=1, window=30, cooldown=60)
+    breaker.record_failure()
+    clock.advance(60)
+    breaker.before_call()
+
+    breaker.record_failure()
+    clock.advance(59)
+    assert breaker.is_open()
+    clock.advance(1)
+    assert not breaker.is_open()
+
+
+def test_breaker_abandoned_probe_times_out(clock):
+    breaker = CircuitBreaker(fail_threshold=1, window=30, cooldown=60)
+    breaker.record_failure()
+    clock.advance(60)
+    breaker.before_call()  # The probe never reports back
+
+    clock.advance(59)
+    assert breaker.is_open()
+    clock.advance(1)
+    assert not breaker.is_open()
+    breaker.before_call()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_retried_rate_limits_are_not_breaker_failures(clock):
+    breaker = CircuitBreaker(fail_threshold=1)
+    handler = RetryHandler(max_retries=2, base_delay=0)
+    func = failing(rate_limit_error(), rate_limit_error())
+
+    assert await handler.retry_with_backoff(func, breaker=breaker) == "ok"
+    assert len(func.calls) == 3
+    assert not breaker.is_open()
+    assert not breaker.failures
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_exhausted_retries_are_one_breaker_failure(clock):
+    breaker = CircuitBreaker(fail_threshold=2)
+    handler = RetryHandler(max_retries=2, base_delay=0)
+    func = failing(*(rate_limit_error() for _ in range(3)))
+
+    # The caller's own retries must not open the breaker under it
+    with pytest.raises(ProviderError):
+        await handler.retry_with_backoff(func, breaker=breaker)
+    assert len(func.calls) == 3
+    assert len(breaker.failures) == 1
+    assert not breaker.is_open()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_client_errors_are_not_breaker_failures(clock):
+    breaker = CircuitBreaker(fail_threshold=1)
+    handler = RetryHandler(max_retries=2, base_delay=0)
+
+    with pytest.raises(ProviderError):
+        await handler.retry_with_backoff(failing(ProviderError(400)), breaker=breaker)
+    assert not breaker.is_open()
+
+    with pytest.raises(ProviderError):
+        await handler.retry_with_backoff(failing(ProviderError(500)), breaker=breaker)
+    assert breaker.is_open()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_probe_is_not_blocked_by_its_own_retries(clock):
+    breaker = CircuitBreaker(fail_threshold=1, cooldown=60)
+    breaker.record_failure()
+    clock.advance(60)
+    handler = RetryHandler(max_retries=2, base_delay=0)
+
+    result = await handler.retry_with_backoff(
+        failing(rate_limit_error()), breaker=breaker
+    )
+    assert result == "ok"
+    assert not breaker.is_open()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_limiter_release_wakes_slot_waiter(clock):
+    limiter = RateLimiter(max_concurrent=1)
+    await limiter.acquire(10, 10)
+
+    waiter = asyncio.create_task(limiter.acquire(10, 10, max_wait_time=5))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    assert limiter.waiting == 1
+
+    await limiter.release(10, 10, 10, 10)
+    await asyncio.wait_for(waiter, timeout=1)
+    assert limiter.concurrent_count == 1
+    assert limiter.waiting == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_limiter_waits_for_refill():
+    # 1000 tokens/s, so the second request waits about 0.1s for a refill
+    limiter = RateLimiter(input_tokens_per_minute=60000, max_concurrent=10)
+    await limiter.acquire(59000, 0)
+
+    start = time.monotonic()
+    await limiter.acquire(917, 0, max_wait_time=5)  # Needs 1100 with its buffer
+    elapsed = time.monotonic() - start
+
+    assert 0.05 < elapsed < 1
+    assert limiter.concurrent_count == 2
+
+
+def test_limiter_seconds_until_available(clock):
+    limiter = RateLimiter(input_tokens_per_minute=6000, output_tokens_per_minute=600)
+    limiter.input_tokens_avail = 0
+
+    # 1.2 * 1000 input tokens refill at 100/s
+    assert limiter._seconds_until_available(1000, 0) == pytest.approx(12)
+    clock.advance(12)
+    limiter._refill()
+    assert limiter._seconds_until_available(1000, 0) == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_limiter_times_out():
+    limiter = RateLimiter(max_concurrent=1)
+    await limiter.acquire(10, 10)
+
+    with pytest.raises(RateLimitError, match="1/1 concurrent"):
+        await limiter.acquire(10, 10, max_wait_time=0.05)
+    assert limiter.concurrent_count == 1
+    assert limiter.waiting == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_limiter_release_settles_estimates(clock):
+    limiter = RateLimiter(input_tokens_per_minute=6000, output_tokens_per_minute=6000)
+
+    # Over-estimates are refunded
+    await limiter.acquire(1000, 500)
+    await limiter.release(800, 100, 1000, 500)
+    assert limiter._get_current_usage() == {
+        "input_tokens": 800,
+        "output_tokens": 100,
+        "concurrent": 0,
+    }
+
+    # Under-estimates are charged
+    await limiter.acquire(1000, 500)
+    await limiter.release(1200, 600, 1000, 500)
+    assert limiter._get_current_usage() == {
+        "input_tokens": 2000,
+        "output_tokens": 700,
+        "concurrent": 0,
+    }
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio calls RedisRateLimiter makes."""
+
+    def __init__(self):
+        self.values = {}
+        self.closed = False
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def mget(self, *keys):
+        return [self.values.get(key) for key in keys]
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    def incrby(self, key, amount):
+        self.commands.append((key, amount))
+        return self
+
+    def expire(self, key, seconds):
+        self.commands.append((key, None))
+        return self
+
+    async def execute(self):
+        results = []
+        for key, amount in self.commands:
+            if amount is None:
+                results.append(True)
+                continue
+            self.redis.values[key] = self.redis.values.get(key, 0) + amount
+            results.append(self.redis.values[key])
+        return results
+
+
+def redis_limiter(**kwargs):
+    return RedisRateLimiter(redis_url="redis://test", client=FakeRedis(), **kwargs)
+
+
+async def redis_usage(limiter):
+    usage = await limiter._get_current_usage()
+    return usage["input_tokens"], usage["output_tokens"], usage["concurrent"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_redis_limiter_reserves_estimates(clock):
+    limiter = redis_limiter(input_tokens_per_minute=1000, output_tokens_per_minute=1000)
+
+    await limiter.acquire(300, 200)
+
+    assert await redis_usage(limiter) == (300, 200, 1)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_redis_limiter_rolls_back_over_limit(clock):
+    limiter = redis_limiter(
+        input_tokens_per_minute=1000, output_tokens_per_minute=1000, max_concurrent=2
+    )
+    await limiter.acquire(900, 0)
+
+    assert not await limiter._try_reserve(200, 0)
+    assert await redis_usage(limiter) == (900, 0, 1)
+
+    with pytest.raises(RateLimitError):
+        await limiter.acquire(200, 0, max_wait_time=0)
+    # The failed acquire gave back its slot
+    assert await redis_usage(limiter) == (900, 0, 1)
+    assert not limiter.slots.locked()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_redis_limiter_admits_oversized_request_in_empty_window(clock):
+    limiter = redis_limiter(input_tokens_per_minute=1000)
+
+    assert await limiter._try_reserve(5000, 0)
+    assert await redis_usage(limiter) == (5000, 0, 0)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_redis_limiter_release_settles_estimates(clock):
+    limiter = redis_limiter(input_tokens_per_minute=6000, output_tokens_per_minute=6000)
+
+    await limiter.acquire(1000, 500)
+    await limiter.release(800, 100, 1000, 500)
+    assert await redis_usage(limiter) == (800, 100, 0)
+
+    await limiter.acquire(1000, 500)
+    await limiter.release(1200, 600, 1000, 500)
+    assert await redis_usage(limiter) == (2000, 700, 0)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_close_rate_limiters_closes_redis_clients(monkeypatch):
+    shared = redis_limiter()
+    local = RateLimiter()
+    limiters = {("openai", "gpt-4o"): shared, ("claude", "claude"): local}
+    monkeypatch.setattr(rate_limiter, "rate_limiters", limiters)
+
+    await close_rate_limiters()
+
+    assert shared.redis.closed
+    assert not limiters
+
+
+@pytest.fixture
+def offline_tiktoken(monkeypatch):
+    """Install a tiktoken whose encodings can't be downloaded; count load attempts."""
+    attempts = []
+
+    def load(name):
+        attempts.append(name)
+        raise OSError("network is unreachable")
+
+    fake = SimpleNamespace(encoding_for_model=load, get_encoding=load)
+    monkeypatch.setitem(sys.modules, "tiktoken", fake)
+    rate_limiter._get_encoding.cache_clear()
+    yield attempts
+    rate_limiter._get_encoding.cache_clear()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_unloadable_encoding_falls_back_to_bytes(offline_tiktoken):
+    await warm_up_token_counting(["gpt-4o"])
+    assert offline_tiktoken == ["gpt-4o"]
+
+    # 13 UTF-8 bytes at 4 bytes per token, with no further download attempts
+    assert estimate_tokens("héllo wörld", "gpt-4o") == 3
+    assert estimate_tokens("héllo wörld", "gpt-4o") == 3
+    assert offline_tiktoken == ["gpt-4o"]